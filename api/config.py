@@ -4,6 +4,8 @@ Simplified - no folder-based or dimension-based settings
 """
 import os
 import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -13,16 +15,52 @@ load_dotenv()
 NOTES_DIR = Path(os.getenv("NOTES_DIR", "~/Notes")).expanduser()
 DB_PATH = NOTES_DIR / ".index" / "notes.sqlite"
 
+# Per-context overrides of the paths above (tests point these at a temp dir
+# without touching the module globals other workers/tasks read). The database
+# may also be a "file:" URI, e.g. a shared-cache in-memory test database
+_notes_dir_var: ContextVar[Path] = ContextVar("notes_dir", default=NOTES_DIR)
+_db_path_var: ContextVar[Path | str] = ContextVar("db_path", default=DB_PATH)
+
+
+def get_notes_dir() -> Path:
+    """Notes directory for the current context (NOTES_DIR unless overridden)"""
+    return _notes_dir_var.get()
+
+
+def get_db_path() -> Path | str:
+    """Database path for the current context (DB_PATH unless overridden)"""
+    return _db_path_var.get()
+
+
+@contextmanager
+def use_notes_dir(notes_dir: Path, db_path: Path | str | None = None):
+    """Point get_notes_dir()/get_db_path() at another notes directory in this context
+
+    db_path defaults to the notes directory's own index file.
+    """
+    notes_token = _notes_dir_var.set(notes_dir)
+    db_token = _db_path_var.set(db_path or notes_dir / ".index" / "notes.sqlite")
+    try:
+        yield
+    finally:
+        _db_path_var.reset(db_token)
+        _notes_dir_var.reset(notes_token)
+
 # Database configuration
 DB_TIMEOUT = 30.0  # 30 seconds timeout for locked database
 
 
+def connect_db(db_path: Path | str, timeout: float = DB_TIMEOUT) -> sqlite3.Connection:
+    """sqlite3.connect() that also accepts "file:" URIs"""
+    return sqlite3.connect(db_path, timeout=timeout, uri=str(db_path).startswith("file:"))
+
+
 def get_db_connection():
     """Get a database connection with proper timeout and WAL mode.
 
     WAL mode allows concurrent reads and writes, preventing most lock issues.
     """
-    con = sqlite3.connect(DB_PATH, timeout=DB_TIMEOUT)
+    con = connect_db(get_db_path())
     # Enable WAL mode for better concurrent access
     con.execute("PRAGMA journal_mode=WAL")
     return con
@@ -36,6 +74,7 @@ BACKEND_PORT = int(os.getenv("BACKEND_PORT", "8787"))
 LLM_MODEL = os.getenv("LLM_MODEL", "qwen3:4b-instruct")
 LLM_BASE_URL = os.getenv("LLM_BASE_URL", "http://127.0.0.1:11434")
 LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.2"))
+LLM_KEEP_ALIVE = os.getenv("LLM_KEEP_ALIVE", "10m")  # How long Ollama keeps the model loaded after a call
 
 # Display config on startup
 print(f"🤖 LLM Model: {LLM_MODEL}")
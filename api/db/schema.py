@@ -1,19 +1,24 @@
 """Database Schema Management
 Defines and initializes all database tables
 """
-import sqlite3
-from ..config import DB_PATH
+from pathlib import Path
+from ..config import connect_db, get_db_path
 
 
 def ensure_db():
     """Initialize complete database schema (multi-dimensional metadata)"""
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    db_path = get_db_path()
+    if isinstance(db_path, Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    con = sqlite3.connect(DB_PATH)
+    con = connect_db(db_path)
     cur = con.cursor()
 
     cur.execute("PRAGMA case_sensitive_like=OFF;")
     cur.execute("PRAGMA foreign_keys=ON;")
+    # WAL persists in the database file, so every later connection gets
+    # concurrent readers alongside a writer
+    cur.execute("PRAGMA journal_mode=WAL;")
 
     # ========================================================================
     # FTS5 full-text search
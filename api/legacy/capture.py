@@ -3,11 +3,16 @@ Note Classification Service
 Direct LLM-based classification (no agent overhead for fast performance)
 """
 import json
+import re
 from langchain_core.tools import tool
-from ..config import VALID_FOLDERS, WORKING_FOLDERS, CLASSIFICATION_CONFIDENCE_THRESHOLD
 from ..llm import get_llm
 from ..llm.prompts import Prompts
 from ..llm.audit import track_llm_call
+from .enrichment import apply_enrichment_defaults, enrich_note_metadata
+
+# Review-flag keyword checks, compiled once instead of scanned per keyword per note
+_UNCERTAINTY_RE = re.compile(r"unsure|could be|might be|unclear|ambiguous|uncertain")
+_FALLBACK_RE = re.compile(r"defaulted|fallback|failed")
 
 
 def _determine_needs_review(result: dict, raw_text: str) -> tuple[bool, list[str]]:
@@ -24,12 +29,11 @@ def _determine_needs_review(result: dict, raw_text: str) -> tuple[bool, list[str
 
     # Heuristic 2: LLM expressed uncertainty
     reasoning = result.get("reasoning", "").lower()
-    uncertainty_keywords = ["unsure", "could be", "might be", "unclear", "ambiguous", "uncertain"]
-    if any(keyword in reasoning for keyword in uncertainty_keywords):
+    if _UNCERTAINTY_RE.search(reasoning):
         reasons.append("LLM expressed uncertainty")
 
     # Heuristic 3: Fallback classification
-    if "defaulted" in reasoning or "fallback" in reasoning or "failed" in reasoning:
+    if _FALLBACK_RE.search(reasoning):
         reasons.append("Fallback classification used")
 
     # Heuristic 4: No dimensions set (weak classification)
@@ -39,6 +43,58 @@ def _determine_needs_review(result: dict, raw_text: str) -> tuple[bool, list[str
 
     return len(reasons) > 0, reasons
 
+
+def _normalize_classification(result: dict, raw_text: str) -> dict:
+    """Validate a parsed classification and add heuristic review flags"""
+    # Extract dimensions from LLM response
+    dimensions = result.get("dimensions", {})
+
+    # Validate dimensions structure - ensure all keys present
+    default_dimensions = {
+        "has_action_items": False,
+        "is_social": False,
+        "is_emotional": False,
+        "is_knowledge": False,
+        "is_exploratory": False
+    }
+
+    # Merge with defaults (in case LLM missed some)
+    for key in default_dimensions:
+        if key not in dimensions:
+            dimensions[key] = default_dimensions[key]
+
+    result["dimensions"] = dimensions
+
+    # Validate status field - ONLY for notes with action items
+    status = result.get("status")
+    if status == "null":
+        status = None
+
+    if dimensions.get("has_action_items"):
+        # Validate status for actionable notes
+        valid_statuses = ["todo", "in_progress", "done", None]
+        if status not in valid_statuses:
+            status = "todo"  # Default to todo for action items
+    else:
+        # Non-actionable notes should NOT have status
+        status = None
+
+    result["status"] = status
+
+    # Ensure required fields
+    result.setdefault("title", raw_text.split("\n")[0][:60])
+    result.setdefault("tags", [])
+    result.setdefault("reasoning", "")
+
+    # Heuristic-based review flagging (no fake confidence)
+    needs_review, review_reasons = _determine_needs_review(result, raw_text)
+    result["needs_review"] = needs_review
+    if review_reasons:
+        result["reasoning"] = result.get("reasoning", "") + " | Review: " + "; ".join(review_reasons)
+
+    return result
+
+
 # LLM client now imported from api.llm
 
 @tool
@@ -144,53 +200,7 @@ async def classify_note_async(raw_text: str) -> dict:
             result = json.loads(response.content)
             tracker.set_parsed_output(result)
 
-        # Extract dimensions from LLM response
-        dimensions = result.get("dimensions", {})
-
-        # Validate dimensions structure - ensure all keys present
-        default_dimensions = {
-            "has_action_items": False,
-            "is_social": False,
-            "is_emotional": False,
-            "is_knowledge": False,
-            "is_exploratory": False
-        }
-
-        # Merge with defaults (in case LLM missed some)
-        for key in default_dimensions:
-            if key not in dimensions:
-                dimensions[key] = default_dimensions[key]
-
-        result["dimensions"] = dimensions
-
-        # Validate status field - ONLY for notes with action items
-        status = result.get("status")
-        if status == "null":
-            status = None
-
-        if dimensions.get("has_action_items"):
-            # Validate status for actionable notes
-            valid_statuses = ["todo", "in_progress", "done", None]
-            if status not in valid_statuses:
-                status = "todo"  # Default to todo for action items
-        else:
-            # Non-actionable notes should NOT have status
-            status = None
-
-        result["status"] = status
-
-        # Ensure required fields
-        result.setdefault("title", raw_text.split("\n")[0][:60])
-        result.setdefault("tags", [])
-        result.setdefault("reasoning", "")
-
-        # Heuristic-based review flagging (no fake confidence)
-        needs_review, review_reasons = _determine_needs_review(result, raw_text)
-        result["needs_review"] = needs_review
-        if review_reasons:
-            result["reasoning"] = result.get("reasoning", "") + " | Review: " + "; ".join(review_reasons)
-
-        return result
+        return _normalize_classification(result, raw_text)
 
     except Exception as e:
         # Fallback on error - default to all dimensions false
@@ -209,3 +219,51 @@ async def classify_note_async(raw_text: str) -> dict:
             "needs_review": True,
             "error": str(e)
         }
+
+
+async def classify_and_enrich_async(raw_text: str) -> dict:
+    """Classify and enrich a note with a single LLM call.
+
+    Sends the note body once instead of once per prompt. If the combined
+    response is missing either part, falls back to classify_note_async()
+    followed by enrich_note_metadata().
+
+    Args:
+        raw_text: The raw note content to classify
+
+    Returns:
+        Dictionary with "classification" (as classify_note_async) and
+        "enrichment" (as enrich_note_metadata)
+    """
+    llm = get_llm()
+    prompt = Prompts.CLASSIFY_AND_ENRICH.format(text=raw_text)
+
+    try:
+        with track_llm_call('classification_enrichment', prompt) as tracker:
+            response = await llm.ainvoke(prompt)
+            tracker.set_response(response)
+
+            combined = json.loads(response.content)
+            tracker.set_parsed_output(combined)
+
+        classification = combined.get("classification")
+        enrichment = combined.get("enrichment")
+        if not (isinstance(classification, dict) and isinstance(enrichment, dict)):
+            raise ValueError("Combined response missing classification or enrichment")
+
+        classification = _normalize_classification(classification, raw_text)
+
+        # Enrichment shares the classification's dimensions
+        for key, value in classification["dimensions"].items():
+            enrichment.setdefault(key, value)
+
+        return {
+            "classification": classification,
+            "enrichment": apply_enrichment_defaults(enrichment)
+        }
+
+    except Exception:
+        # Fall back to the two-call path
+        classification = await classify_note_async(raw_text)
+        enrichment = await enrich_note_metadata(raw_text, classification)
+        return {"classification": classification, "enrichment": enrichment}
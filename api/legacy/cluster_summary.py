@@ -2,10 +2,9 @@
 Cluster Summary Service
 Aggregates metadata across cluster nodes and generates semantic summaries
 """
-import sqlite3
 import json
 from typing import Dict, List
-from ..config import DB_PATH
+from ..config import get_db_connection
 from ..llm import get_llm
 from ..llm.prompts import Prompts
 
@@ -47,7 +46,7 @@ async def get_cluster_summary(cluster_id: int, node_ids: List[str]) -> Dict:
             }
         }
 
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     placeholders = ','.join('?' * len(node_ids))
@@ -2,11 +2,10 @@
 Cluster Detection Service
 Uses Louvain algorithm to detect communities in the knowledge graph
 """
-import sqlite3
 from typing import Dict, List, Set
 import networkx as nx
 import community as community_louvain
-from ..config import DB_PATH
+from ..config import get_db_connection
 
 
 # Link type weights for clustering
@@ -29,7 +28,7 @@ def detect_clusters(min_links: int = 1, limit: int = 100) -> Dict[int, List[str]
         Dictionary mapping cluster_id -> list of note_ids
         Example: {0: ['note1', 'note2'], 1: ['note3', 'note4']}
     """
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     # Get all notes with sufficient links
@@ -114,7 +113,7 @@ def get_cluster_stats(clusters: Dict[int, List[str]]) -> Dict[int, Dict]:
             }
         }
     """
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     stats = {}
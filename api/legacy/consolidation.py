@@ -6,15 +6,14 @@ Inspired by brain's memory consolidation during sleep - runs asynchronously
 to find and create meaningful connections without blocking note capture.
 """
 import json
-import sqlite3
 import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-from ..config import DB_PATH
+from ..config import get_db_connection
 from ..llm import get_llm
 from ..llm.prompts import Prompts
 from ..llm.audit import track_llm_call
-from ..repositories import graph_repo, notes_repo
+from .graph import add_link
 
 
 def _iso_now():
@@ -27,6 +26,17 @@ def _iso_today_start():
     return today.isoformat()
 
 
+def _note_ids_created_today() -> List[str]:
+    """IDs of the notes created since local midnight, oldest first"""
+    con = get_db_connection()
+    rows = con.execute(
+        "SELECT id FROM notes_meta WHERE created >= ? ORDER BY created",
+        (_iso_today_start(),)
+    ).fetchall()
+    con.close()
+    return [row[0] for row in rows]
+
+
 def calculate_candidate_overlap(note: Dict, candidate_id: str, candidate_path: str,
                                 note_tags: set = None, db_cursor=None) -> Dict:
     """Calculate how many dimensions two notes share.
@@ -56,7 +66,7 @@ def calculate_candidate_overlap(note: Dict, candidate_id: str, candidate_path: s
     # Use provided cursor or create new connection
     own_connection = False
     if db_cursor is None:
-        con = sqlite3.connect(DB_PATH)
+        con = get_db_connection()
         cur = con.cursor()
         own_connection = True
     else:
@@ -133,7 +143,7 @@ def find_link_candidates(note: Dict, max_candidates: int = 10,
     Returns:
         List of candidate dicts with: id, title, snippet, match_reason
     """
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     candidates = {}  # Use dict to deduplicate by note_id
@@ -398,7 +408,7 @@ async def consolidate_note(note_id: str) -> Dict:
 
     # Timing: Database query
     db_start = time.time()
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     # Get note data
@@ -473,7 +483,7 @@ async def consolidate_note(note_id: str) -> Dict:
     links_added = 0
     for link in suggested_links:
         try:
-            graph_repo.add_link(note["id"], link["id"], link["link_type"])
+            add_link(note["id"], link["id"], link["link_type"])
             links_added += 1
         except Exception as e:
             print(f"Error storing link from {note['id']} to {link['id']}: {e}")
@@ -482,7 +492,7 @@ async def consolidate_note(note_id: str) -> Dict:
     timings['total'] = time.time() - start_time
 
     # Update consolidated_at timestamp
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
     cur.execute(
         "UPDATE notes_meta SET consolidated_at = ? WHERE id = ?",
@@ -545,6 +555,4 @@ async def consolidate_daily_notes() -> Dict:
     Returns:
         Dict with aggregated consolidation statistics
     """
-    notes = notes_repo.get_created_today()
-    note_ids = [note["id"] for note in notes]
-    return await consolidate_notes(note_ids)
+    return await consolidate_notes(_note_ids_created_today())
@@ -7,13 +7,32 @@ from datetime import datetime
 from ..llm import get_llm
 from ..llm.prompts import Prompts
 from ..llm.audit import track_llm_call
-from ..config import WORKING_FOLDERS
+from .graph import index_note_with_enrichment
 
 
 def _iso_now():
     return datetime.now().astimezone().replace(microsecond=0).isoformat()
 
 
+def apply_enrichment_defaults(result: dict) -> dict:
+    """Fill in any dimensions/arrays the LLM left out of an enrichment result"""
+    # Ensure all boolean dimensions exist
+    result.setdefault("has_action_items", False)
+    result.setdefault("is_social", False)
+    result.setdefault("is_emotional", False)
+    result.setdefault("is_knowledge", False)
+    result.setdefault("is_exploratory", False)
+
+    # Ensure all arrays exist
+    result.setdefault("people", [])
+    result.setdefault("entities", [])
+    result.setdefault("emotions", [])
+    result.setdefault("time_references", [])
+    result.setdefault("reasoning", "")
+
+    return result
+
+
 async def enrich_note_metadata(text: str, primary_classification: dict) -> dict:
     """Extract multi-dimensional metadata from a note.
 
@@ -60,21 +79,7 @@ async def enrich_note_metadata(text: str, primary_classification: dict) -> dict:
             result = json.loads(response.content)
             tracker.set_parsed_output(result)
 
-        # Ensure all boolean dimensions exist
-        result.setdefault("has_action_items", False)
-        result.setdefault("is_social", False)
-        result.setdefault("is_emotional", False)
-        result.setdefault("is_knowledge", False)
-        result.setdefault("is_exploratory", False)
-
-        # Ensure all arrays exist
-        result.setdefault("people", [])
-        result.setdefault("entities", [])
-        result.setdefault("emotions", [])
-        result.setdefault("time_references", [])
-        result.setdefault("reasoning", "")
-
-        return result
+        return apply_enrichment_defaults(result)
 
     except Exception as e:
         # Return empty enrichment on error
@@ -94,14 +99,12 @@ async def enrich_note_metadata(text: str, primary_classification: dict) -> dict:
 
 
 def store_enrichment_metadata(note_id: str, enrichment: dict, db_connection):
-    """Store enrichment metadata in database tables using repository.
+    """Store enrichment metadata in the graph tables (notes_entities, notes_dimensions).
 
     Args:
         note_id: Note ID to associate metadata with
         enrichment: Result from enrich_note_metadata()
         db_connection: SQLite connection object
     """
-    from ..repositories import graph_repo
-
-    # Use repository to batch store all enrichment metadata
-    graph_repo.store_enrichment(note_id, enrichment, db_connection)
+    # Batch store all enrichment metadata
+    index_note_with_enrichment(note_id, enrichment, db_connection)
@@ -2,10 +2,9 @@
 Graph Helper Functions for Multi-Dimensional Note System
 Provides CRUD operations for dimensions, entities, and links
 """
-import sqlite3
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
-from .config import DB_PATH
+from ..config import get_db_connection
 
 
 def _iso_now():
@@ -29,7 +28,7 @@ def add_dimension(note_id: str, dimension_type: str, dimension_value: str,
     """
     should_close = False
     if db_connection is None:
-        db_connection = sqlite3.connect(DB_PATH)
+        db_connection = get_db_connection()
         should_close = True
 
     cur = db_connection.cursor()
@@ -60,7 +59,7 @@ def add_entity(note_id: str, entity_type: str, entity_value: str,
     """
     should_close = False
     if db_connection is None:
-        db_connection = sqlite3.connect(DB_PATH)
+        db_connection = get_db_connection()
         should_close = True
 
     cur = db_connection.cursor()
@@ -88,7 +87,7 @@ def add_link(from_note_id: str, to_note_id: str, link_type: str,
     """
     should_close = False
     if db_connection is None:
-        db_connection = sqlite3.connect(DB_PATH)
+        db_connection = get_db_connection()
         should_close = True
 
     cur = db_connection.cursor()
@@ -122,7 +121,7 @@ def index_note_with_enrichment(note_id: str, enrichment: dict, db_connection=Non
     """
     should_close = False
     if db_connection is None:
-        db_connection = sqlite3.connect(DB_PATH)
+        db_connection = get_db_connection()
         should_close = True
 
     try:
@@ -183,7 +182,7 @@ def get_dimensions(note_id: str) -> List[Dict[str, str]]:
     Returns:
         List of dicts with keys: dimension_type, dimension_value, created
     """
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     cur.execute(
@@ -216,7 +215,7 @@ def get_entities(note_id: str) -> List[Dict[str, str]]:
     Returns:
         List of dicts with keys: entity_type, entity_value, entity_metadata, created
     """
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     cur.execute(
@@ -251,7 +250,7 @@ def get_linked_notes(note_id: str, link_type: Optional[str] = None) -> List[Dict
     Returns:
         List of dicts with keys: to_note_id, link_type, created
     """
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     if link_type:
@@ -294,7 +293,7 @@ def get_backlinks(note_id: str, link_type: Optional[str] = None) -> List[Dict[st
     Returns:
         List of dicts with keys: from_note_id, link_type, created
     """
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     if link_type:
@@ -356,7 +355,7 @@ def find_notes_by_dimension(dimension_type: str, dimension_value: str) -> List[s
     Returns:
         List of note IDs
     """
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     cur.execute(
@@ -387,7 +386,7 @@ def find_notes_by_entity(entity_type: str, entity_value: str) -> List[str]:
         - "psych" matches "psychology", "psychologist"
         - "FAISS" matches "FAISS" (exact match still works)
     """
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     cur.execute(
@@ -412,7 +411,7 @@ def find_notes_by_person(person_name: str) -> List[str]:
     Returns:
         List of note IDs
     """
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     cur.execute(
@@ -438,7 +437,7 @@ def get_graph_neighborhood(note_id: str, depth: int = 1) -> Dict:
     Returns:
         Dict with 'nodes' and 'edges' for graph visualization
     """
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     visited = set()
@@ -535,7 +534,7 @@ def get_full_graph(
         get_full_graph(dimension_filter="is_knowledge")  # Only knowledge notes
         get_full_graph(limit=100)  # First 100 notes
     """
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     # Build query with filters
@@ -27,8 +27,7 @@ from .graph import get_full_graph
 from .notes import write_markdown, update_note_status
 from .fts import search_notes
 from .db import ensure_db
-from .config import BACKEND_HOST, BACKEND_PORT, LLM_MODEL, DB_PATH
-import sqlite3
+from .config import BACKEND_HOST, BACKEND_PORT, LLM_MODEL, get_db_connection
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -77,7 +76,6 @@ async def capture_note(req: ClassifyRequest):
     4. Create prospective edges for time references (Phase 3)
     5. Background: Semantic linking via embeddings (Phase 2 - TODO)
     """
-    from .config import get_db_connection
     from datetime import datetime
 
     con = get_db_connection()
@@ -209,7 +207,7 @@ async def enrich_note_background(note_id: str, note_path: str, note_text: str):
         # Step 4: Store enrichment in database
         if enrichment:
             try:
-                con = sqlite3.connect(DB_PATH)
+                con = get_db_connection()
                 store_enrichment_metadata(note_id, enrichment, con)
                 con.close()
             except Exception as e:
@@ -557,7 +555,7 @@ async def get_note_content(note_id: str):
         404: Note ID not found in database
     """
     # Get the file path from database
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
     cur.execute("SELECT path FROM notes_meta WHERE id = ?", (note_id,))
     row = cur.fetchone()
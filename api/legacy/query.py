@@ -2,9 +2,8 @@
 Query Service for Multi-Dimensional Note Search
 Provides high-level query functions that orchestrate graph.py helpers
 """
-import sqlite3
 from typing import List, Dict, Optional
-from ..graph import (
+from .graph import (
     find_notes_by_dimension,
     find_notes_by_entity,
     find_notes_by_person,
@@ -13,6 +12,7 @@ from ..graph import (
     get_dimensions
 )
 from ..fts import search_notes
+from ..config import get_db_connection
 
 
 def search_by_dimension(dimension_type: str, dimension_value: str,
@@ -50,8 +50,7 @@ def search_by_dimension(dimension_type: str, dimension_value: str,
             return []  # Unknown context
 
         # Query boolean flags directly
-        from ..config import DB_PATH
-        con = sqlite3.connect(DB_PATH)
+        con = get_db_connection()
         cur = con.cursor()
         cur.execute(
             f"SELECT id FROM notes_meta WHERE {dimension_key} = 1 ORDER BY created DESC",
@@ -239,13 +238,10 @@ def _get_paths_for_note_ids(note_ids: List[str]) -> Dict[str, str]:
     Returns:
         Dict mapping note_id -> path
     """
-    import sqlite3
-    from ..config import DB_PATH
-
     if not note_ids:
         return {}
 
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     placeholders = ','.join(['?' for _ in note_ids])
@@ -269,13 +265,10 @@ def _filter_by_context(note_ids: List[str], context: str) -> List[str]:
     Returns:
         Filtered list of note IDs
     """
-    import sqlite3
-    from ..config import DB_PATH
-
     if not note_ids:
         return []
 
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     placeholders = ','.join(['?' for _ in note_ids])
@@ -340,15 +333,13 @@ def _format_results_from_ids(note_ids: List[str]) -> List[Dict]:
     Returns:
         Formatted results with path, snippet, score, metadata
     """
-    import sqlite3
     import yaml
-    from ..config import DB_PATH
 
     if not note_ids:
         return []
 
     # Get note metadata from DB
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     placeholders = ','.join(['?' for _ in note_ids])
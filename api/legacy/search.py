@@ -7,6 +7,7 @@ from langchain_core.tools import tool
 from ..llm import get_llm
 from ..llm.prompts import Prompts
 from ..fts import search_notes as fts_search
+from ..config import get_db_connection
 
 
 @tool
@@ -123,7 +124,7 @@ async def parse_smart_query(natural_query: str) -> dict:
         }
 
 
-async def search_notes_smart(natural_query: str, limit: int = 10, status: str = None) -> list:
+async def search_notes_smart(natural_query: str, limit: int = 10, status: str = None, filters: dict = None) -> list:
     """Smart search with natural language understanding and multi-dimensional routing.
 
     Flow:
@@ -136,6 +137,8 @@ async def search_notes_smart(natural_query: str, limit: int = 10, status: str =
         natural_query: Natural language search query
         limit: Maximum number of results
         status: Optional status filter (todo, in_progress, done)
+        filters: Optional parse_smart_query() result for natural_query, when the
+            caller already parsed it (e.g. concurrently with other work); skips step 1
 
     Returns:
         List of search results with path, snippet, score
@@ -144,7 +147,8 @@ async def search_notes_smart(natural_query: str, limit: int = 10, status: str =
     from .query import search_by_person, search_by_dimension, search_by_entity
 
     # Step 1: Parse query to extract filters (1 LLM call)
-    filters = await parse_smart_query(natural_query)
+    if filters is None:
+        filters = await parse_smart_query(natural_query)
 
     # Step 2: Route to appropriate search endpoint
     results = []
@@ -176,7 +180,7 @@ async def search_notes_smart(natural_query: str, limit: int = 10, status: str =
 
     elif filters.get("text_query"):
         # Fall back to FTS5 text search
-        results = fts_search(filters["text_query"], limit=limit, status=status)
+        results = fts_search(filters["text_query"], limit=limit)
 
         # If context filter exists, filter results by dimensions
         if filters.get("context") and results:
@@ -204,7 +208,7 @@ async def search_notes_smart(natural_query: str, limit: int = 10, status: str =
                     results = filtered_results
     else:
         # No filters extracted, fall back to text search
-        results = fts_search(natural_query, limit=limit, status=status)
+        results = fts_search(natural_query, limit=limit)
 
     # Mark results if relaxed search was used
     if relaxed_search and results:
@@ -217,9 +221,16 @@ async def search_notes_smart(natural_query: str, limit: int = 10, status: str =
 
     # Step 3: Apply status filter if specified (for task searches)
     if status and results:
-        # Status filter is already handled by Phase 3.1 endpoints
-        # Only needed for FTS5 fallback (already applied above)
-        pass
+        # None of the search endpoints filter by status, so match paths against notes_meta
+        con = get_db_connection()
+        placeholders = ','.join(['?' for _ in results])
+        rows = con.execute(
+            f"SELECT path FROM notes_meta WHERE status = ? AND path IN ({placeholders})",
+            [status, *(r["path"] for r in results)]
+        ).fetchall()
+        con.close()
+        matching_paths = {row[0] for row in rows}
+        results = [r for r in results if r["path"] in matching_paths]
 
     # Step 4: Apply sort if specified
     if filters.get("sort") == "recent":
@@ -1,4 +1,4 @@
 """LLM Infrastructure - Centralized LLM client and prompts"""
-from .client import get_llm, initialize_llm, shutdown_llm
+from .client import get_llm, initialize_llm, shutdown_llm, warm_up_llm
 
-__all__ = ["get_llm", "initialize_llm", "shutdown_llm"]
+__all__ = ["get_llm", "initialize_llm", "shutdown_llm", "warm_up_llm"]
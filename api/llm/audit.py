@@ -11,7 +11,7 @@ import sqlite3
 from datetime import datetime
 from typing import Optional, Dict, Any
 from contextlib import contextmanager
-from ..config import DB_PATH, LLM_MODEL, get_db_connection
+from ..config import LLM_MODEL, connect_db, get_db_connection, get_db_path
 
 
 def _iso_now():
@@ -221,7 +221,7 @@ def get_operation_stats(operation_type: Optional[str] = None, days: int = 7) ->
         Dict with statistics (total_ops, avg_duration, total_cost, etc.)
     """
     # Use WAL mode for concurrent access
-    con = sqlite3.connect(DB_PATH, timeout=30.0)
+    con = connect_db(get_db_path(), timeout=30.0)
     con.execute("PRAGMA journal_mode=WAL")
     cur = con.cursor()
 
@@ -5,7 +5,7 @@ Singleton instance shared across all services
 import httpx
 from langchain_ollama import ChatOllama
 from typing import Optional
-from ..config import LLM_MODEL, LLM_BASE_URL, LLM_TEMPERATURE
+from ..config import LLM_MODEL, LLM_BASE_URL, LLM_TEMPERATURE, LLM_KEEP_ALIVE
 
 # Global singleton instances
 _http_client: Optional[httpx.AsyncClient] = None
@@ -49,6 +49,7 @@ def get_llm(temperature: Optional[float] = None, format: Optional[str] = _UNSET)
             model=LLM_MODEL,
             temperature=temperature if temperature is not None else LLM_TEMPERATURE,
             format=format if format is not _UNSET else None,
+            keep_alive=LLM_KEEP_ALIVE,
             http_client=get_http_client()
         )
 
@@ -59,6 +60,7 @@ def get_llm(temperature: Optional[float] = None, format: Optional[str] = _UNSET)
             model=LLM_MODEL,
             temperature=LLM_TEMPERATURE,
             format="json",  # Default to JSON format
+            keep_alive=LLM_KEEP_ALIVE,
             http_client=get_http_client()
         )
     return _llm_instance
@@ -81,6 +83,19 @@ async def initialize_llm():
         )
 
 
+async def warm_up_llm():
+    """Load the model into Ollama's memory ahead of the first real call
+
+    An empty generate request only loads the weights (no tokens are produced)
+    and keeps them resident for LLM_KEEP_ALIVE.
+    """
+    response = await get_http_client().post(
+        f"{LLM_BASE_URL}/api/generate",
+        json={"model": LLM_MODEL, "keep_alive": LLM_KEEP_ALIVE}
+    )
+    response.raise_for_status()
+
+
 async def shutdown_llm():
     """Cleanup LLM client on application shutdown
 
@@ -117,6 +117,58 @@ Rules:
 - Multiple dimensions can be true
 - Return ONLY JSON with: 5 dimensions, people, entities, emotions, time_references, reasoning
 
+JSON:"""
+
+    # ========================================================================
+    # COMBINED CLASSIFICATION + ENRICHMENT PROMPT
+    # ========================================================================
+
+    CLASSIFY_AND_ENRICH = """You are a note classifier and metadata extractor. Analyze this note and return JSON.
+
+Note: {text}
+
+Return ONLY valid JSON with both objects:
+{{
+  "classification": {{
+    "title": "Short descriptive title (max 10 words)",
+    "dimensions": {{
+      "has_action_items": true|false,
+      "is_social": true|false,
+      "is_emotional": true|false,
+      "is_knowledge": true|false,
+      "is_exploratory": true|false
+    }},
+    "reasoning": "Brief explanation of dimension choices",
+    "tags": ["tag1", "tag2", "tag3"],
+    "status": "todo|in_progress|done|null"
+  }},
+  "enrichment": {{
+    "people": [{{"name": "...", "role": "...", "relation": "..."}}],
+    "entities": ["..."],
+    "emotions": ["..."],
+    "time_references": [{{"type": "meeting|deadline", "datetime": null, "description": "..."}}],
+    "reasoning": "Brief explanation of extraction"
+  }}
+}}
+
+Dimensions:
+- has_action_items: actionable todos/tasks (ONLY these notes can have status)
+- is_social: conversations, meetings, discussions with other people
+- is_emotional: personal feelings, reflections, emotional states
+- is_knowledge: learnings, how-tos, reference information
+- is_exploratory: brainstorms, hypotheses, "what if" thinking
+
+Enrichment:
+- people: ALL person names, even casual mentions
+- entities: specific concepts, tools, projects, topics ("FAISS", "Python")
+- emotions: feeling words only if clearly expressed
+- time_references: dates, deadlines, meetings
+
+Rules:
+1. Multiple dimensions can be TRUE simultaneously
+2. Be conservative - only set dimensions / extract items that are CLEARLY present (empty arrays OK)
+3. Tags should be lowercase, 3-6 relevant keywords
+
 JSON:"""
 
     # ========================================================================
@@ -4,7 +4,7 @@ import yaml
 from datetime import datetime
 import uuid
 from pathlib import Path
-from .config import NOTES_DIR
+from .config import get_notes_dir
 from .fts import index_note
 
 SLUG_RE = re.compile(r"[^a-z0-9\-]+")
@@ -40,8 +40,8 @@ def write_markdown(title: str, tags: list, body: str, db_connection=None):
     updated = created
     nid = f"{created}_{uuid.uuid4().hex[:4]}"
 
-    # Flat structure - all notes go to NOTES_DIR root
-    notes_dir = NOTES_DIR
+    # Flat structure - all notes go to the notes directory root
+    notes_dir = get_notes_dir()
     notes_dir.mkdir(parents=True, exist_ok=True)
 
     # Generate filename
@@ -0,0 +1,36 @@
+"""
+Background AgentOps session ends for the agent test scripts.
+
+Ending a session uploads its trace, which is slow and irrelevant to the test
+result, so it runs in a worker thread off each test's critical path; main()
+awaits drain_session_ends() before exiting so no upload is lost.
+"""
+import asyncio
+from typing import List, Optional
+
+import agentops
+
+_pending_session_ends: List[asyncio.Task] = []
+
+
+def end_session_in_background(session, error: Optional[str] = None):
+    """End an AgentOps session in a worker thread without waiting for the upload"""
+    kwargs = {"error": error} if error is not None else {}
+    _pending_session_ends.append(
+        asyncio.create_task(asyncio.to_thread(agentops.end_session, session, **kwargs))
+    )
+
+
+async def drain_session_ends():
+    """Wait for every background session end to finish"""
+    await asyncio.gather(*_pending_session_ends, return_exceptions=True)
+    _pending_session_ends.clear()
+
+
+def end_test_session(session, results):
+    """End a test's AgentOps session, recording the first failed query (if any)"""
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors:
+        end_session_in_background(session, error=str(errors[0]))
+    else:
+        end_session_in_background(session)
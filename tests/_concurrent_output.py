@@ -0,0 +1,116 @@
+"""
+Per-task stdout buffering for test scripts that run their scenarios concurrently.
+
+While buffered_stdout() is active, print() from a task inside task_output()
+(or run_buffered()) goes to that task's own buffer instead of the terminal, so
+concurrent tests don't interleave their output; each buffer is printed in one
+piece afterwards, either directly or through an OutputWriter.
+"""
+import asyncio
+import contextlib
+import contextvars
+import io
+import sys
+
+# Buffer of the task currently inside task_output() (None: write through)
+_task_output: contextvars.ContextVar = contextvars.ContextVar("task_output", default=None)
+
+
+class TaskStdout:
+    """sys.stdout proxy that writes to the current task's buffer when one is set"""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text):
+        buffer = _task_output.get()
+        return (buffer if buffer is not None else self._stream).write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+
+@contextlib.contextmanager
+def buffered_stdout():
+    """Route sys.stdout through TaskStdout; yields the real stream"""
+    real_stdout = sys.stdout
+    sys.stdout = TaskStdout(real_stdout)
+    try:
+        yield real_stdout
+    finally:
+        sys.stdout = real_stdout
+
+
+@contextlib.contextmanager
+def task_output():
+    """Buffer the current task's output while the block runs; yields the buffer"""
+    buffer = io.StringIO()
+    token = _task_output.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _task_output.reset(token)
+
+
+async def run_buffered(coro, header: str = "") -> str:
+    """Run one test with its output buffered; a failure is reported, not propagated"""
+    with task_output() as buffer:
+        try:
+            if header:
+                print(header)
+            await coro
+        except Exception as e:
+            print(f"❌ Test failed: {e}")
+    return buffer.getvalue()
+
+
+async def run_tests_concurrently(*tests) -> None:
+    """Run test coroutines (or (header, coroutine) pairs) concurrently, then print each one's output in order"""
+    tests = [test if isinstance(test, tuple) else ("", test) for test in tests]
+    with buffered_stdout():
+        outputs = await asyncio.gather(*(run_buffered(coro, header) for header, coro in tests))
+
+    for output in outputs:
+        print(output, end="")
+
+
+class OutputWriter:
+    """Single background task that writes queued output blocks off the event loop"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    def write(self, text: str):
+        self._queue.put_nowait(text)
+
+    async def _run(self):
+        while True:
+            text = await self._queue.get()
+            try:
+                await asyncio.to_thread(self._flush, text)
+            finally:
+                self._queue.task_done()
+
+    def _flush(self, text: str):
+        self._stream.write(text)
+        self._stream.flush()
+
+    async def drain(self):
+        """Wait until everything queued so far has been written"""
+        await self._queue.join()
+
+    async def close(self):
+        """Write everything still queued, then stop"""
+        await self.drain()
+        self._task.cancel()
+
+
+async def run_to_writer(coro, writer: OutputWriter):
+    """Run a coroutine with its output buffered, then hand it to the writer in one piece"""
+    with task_output() as buffer:
+        try:
+            return await coro
+        finally:
+            writer.write(buffer.getvalue())
@@ -0,0 +1,207 @@
+"""
+On-disk exact-match cache for LLM responses in the test scripts.
+
+Test inputs are fixed, so a rerun with the same request can be answered from
+disk instead of waiting on the model. Only raw model responses are stored: a
+failed call raises before anything is written, so a service's error fallback
+is never replayed.
+
+There are two stores:
+    tests/.llm_cache/<key>.json  get_llm() responses for the regression suite,
+                                 one readable JSON file per (model, prompt);
+                                 meant to be committed so LLM_CACHE=replay
+                                 works on a fresh checkout
+    tests/.llm_cache.sqlite      ollama chat responses for test_llm_tools.py
+                                 (local only, git-ignored)
+
+LLM_CACHE selects the mode:
+    1 (default)  read through: answer hits from the cache, store misses
+    record       always query the model and overwrite the cached entry
+    replay       never query the model; a miss raises CacheMiss (offline runs)
+    0            bypass the cache entirely
+"""
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import zlib
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Tuple
+
+try:
+    from ollama import ChatResponse
+except ImportError:  # older ollama clients return plain dicts
+    ChatResponse = None
+
+try:
+    from langchain_core.messages import AIMessage
+except ImportError:  # only the get_llm() services need it
+    AIMessage = None
+
+CACHE_PATH = Path(__file__).parent / ".llm_cache.sqlite"
+RECORDINGS_DIR = Path(__file__).parent / ".llm_cache"
+CACHE_MODE = os.getenv("LLM_CACHE", "1")
+
+
+class CacheMiss(BaseException):
+    """Raised in replay mode when a request has no cached response
+
+    Not an Exception, so a service's ``except Exception`` fallback can't turn a
+    missing recording into a passing result.
+    """
+
+_con = None
+
+
+def _connection() -> sqlite3.Connection:
+    global _con
+    if _con is None:
+        if CACHE_MODE == "replay" and not CACHE_PATH.exists():
+            # Don't leave an empty database behind
+            raise CacheMiss(f"{CACHE_PATH} not found (LLM_CACHE=replay needs a recorded cache)")
+        _con = sqlite3.connect(CACHE_PATH, timeout=30)
+        _con.execute("PRAGMA journal_mode=WAL")
+        _con.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB)")
+    return _con
+
+
+def _lookup(key: str) -> Any:
+    """Cached JSON value for key, or None when it must come from the model"""
+    if CACHE_MODE in ("0", "record"):
+        return None
+    row = _connection().execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        if CACHE_MODE == "replay":
+            raise CacheMiss(f"No cached LLM response for {key} (LLM_CACHE=replay)")
+        return None
+    return json.loads(zlib.decompress(row[0]))
+
+
+def _store(key: str, data: Any):
+    if CACHE_MODE == "0":
+        return
+    con = _connection()
+    con.execute(
+        "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)",
+        (key, zlib.compress(json.dumps(data).encode()))
+    )
+    con.commit()
+
+
+def bypass_cache():
+    """Skip both stores for the rest of the run (--no-cache), leaving them intact"""
+    global CACHE_MODE
+    CACHE_MODE = "0"
+
+
+# id(obj) -> (obj, encoded JSON) for the static tools/format schemas; holding
+# obj keeps its id from being reused while the entry exists
+_static_json: Dict[int, Tuple[Any, bytes]] = {}
+
+
+def _encode(obj: Any) -> bytes:
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False).encode()
+
+
+def _encode_static(obj: Any) -> bytes:
+    """Encode a schema that is the same object on every call only once"""
+    entry = _static_json.get(id(obj))
+    if entry is None or entry[0] is not obj:
+        entry = _static_json[id(obj)] = (obj, _encode(obj))
+    return entry[1]
+
+
+def cache_key(kwargs: Dict[str, Any]) -> str:
+    """SHA-256 of the request fields that determine the response"""
+    digest = hashlib.sha256()
+    for part in (
+        _encode(kwargs['model']),
+        _encode(kwargs['messages']),
+        _encode_static(kwargs.get('tools')),
+        _encode(kwargs.get('options')),
+        _encode_static(kwargs.get('format')),
+    ):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+async def cached_chat(client, **kwargs):
+    """client.chat(**kwargs), answered from the on-disk cache when possible"""
+    key = cache_key(kwargs)
+    data = _lookup(key)
+    if data is not None:
+        return ChatResponse.model_validate(data) if ChatResponse is not None else data
+
+    response = await client.chat(**kwargs)
+    _store(key, response.model_dump(mode='json') if hasattr(response, 'model_dump') else response)
+    return response
+
+
+def prompt_key(model: str, prompt: str) -> str:
+    """SHA-256 of the model settings and the rendered prompt"""
+    digest = hashlib.sha256(_encode(model))
+    digest.update(b"\0")
+    digest.update(prompt.encode())
+    return digest.hexdigest()
+
+
+def _recording_path(key: str) -> Path:
+    return RECORDINGS_DIR / f"{key}.json"
+
+
+def _load_recording(key: str) -> Any:
+    """Recorded get_llm() response for key, or None when it must come from the model"""
+    if CACHE_MODE in ("0", "record"):
+        return None
+    try:
+        return json.loads(_recording_path(key).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        if CACHE_MODE == "replay":
+            raise CacheMiss(f"No recorded LLM response {_recording_path(key)} (LLM_CACHE=replay)")
+        return None
+
+
+def _save_recording(key: str, recording: Dict[str, Any]):
+    if CACHE_MODE == "0":
+        return
+    RECORDINGS_DIR.mkdir(exist_ok=True)
+    path = _recording_path(key)
+    # Write then rename, so a concurrent (xdist) reader never sees half a file
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(recording, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class CachedLLM:
+    """A get_llm() client whose ainvoke() answers come from tests/.llm_cache/"""
+
+    def __init__(self, llm):
+        self._llm = llm
+        # Everything besides the prompt that changes the answer
+        self._model = f"{llm.model}@{llm.temperature}/{llm.format or ''}"
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
+
+    async def ainvoke(self, prompt: str, **kwargs):
+        key = prompt_key(self._model, prompt)
+        recording = _load_recording(key)
+        if recording is not None:
+            content = recording["content"]
+            return AIMessage(content=content) if AIMessage is not None else SimpleNamespace(content=content)
+
+        response = await self._llm.ainvoke(prompt, **kwargs)
+        # The model and prompt are kept next to the answer so a recording can be reviewed
+        _save_recording(key, {"model": self._model, "prompt": prompt, "content": response.content})
+        return response
+
+
+def cached_llm(get_llm):
+    """Wrap get_llm() so every client it returns answers through the cache"""
+    @functools.wraps(get_llm)
+    def wrapper(*args, **kwargs):
+        return CachedLLM(get_llm(*args, **kwargs))
+    return wrapper
@@ -0,0 +1,99 @@
+"""
+Helpers shared by the LLM tool-calling test scripts: fast JSON (orjson when
+installed, stdlib json otherwise) and the arithmetic-only evaluator behind the
+calculate tools.
+"""
+import ast
+import functools
+import json
+import math
+import operator
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback
+    orjson = None
+
+
+def json_loads(text):
+    """Parse JSON with orjson when available (errors are json.JSONDecodeError either way)"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def json_dumps(obj, pretty: bool = False) -> str:
+    """Serialize to a JSON string with orjson when available (indented when pretty)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None).decode()
+        except TypeError:  # e.g. ints beyond 64 bits from calculate
+            pass
+    return json.dumps(obj, indent=2 if pretty else None)
+
+
+# Arithmetic-only evaluator for the calculate tools (replaces eval): numbers,
+# + - * / // % **, unary +/- and calls to the math functions below
+MAX_EXPONENT = 1000
+# Integer results beyond this many bits (~3000 digits) are refused before computing
+MAX_RESULT_BITS = 10_000
+
+
+def _power(base, exponent):
+    """base ** exponent, refusing exponents/integer results too large to compute quickly
+
+    The bound is on the result, not just the literal exponent, so nested powers
+    like ((10**1000)**1000)**1000 fail fast instead of hanging.
+    """
+    if abs(exponent) > MAX_EXPONENT:
+        raise ValueError(f"Exponent too large: {exponent}")
+    if isinstance(base, int) and isinstance(exponent, int) and abs(base) > 1:
+        bits = base.bit_length() * exponent
+        if bits > MAX_RESULT_BITS:
+            raise ValueError(f"Result too large: ~{bits} bits")
+    return operator.pow(base, exponent)
+
+
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _power,
+}
+_UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+# Functions a call may name (bare names only - no attribute access)
+_FUNCTIONS = {
+    'sqrt': math.sqrt,
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'log': math.log,
+    'exp': math.exp,
+    'pow': math.pow,
+    'abs': abs,
+}
+
+
+def _eval_node(node):
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        return _BINARY_OPS[type(node.op)](_eval_node(node.left), _eval_node(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        return _UNARY_OPS[type(node.op)](_eval_node(node.operand))
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in _FUNCTIONS and not node.keywords):
+        return _FUNCTIONS[node.func.id](*(_eval_node(arg) for arg in node.args))
+    raise ValueError(f"Unsupported expression element: {type(node).__name__}")
+
+
+@functools.lru_cache(maxsize=256)
+def evaluate_expression(expression: str):
+    """Evaluate an arithmetic expression, optionally calling the _FUNCTIONS (memoized - results are deterministic)"""
+    return _eval_node(ast.parse(expression.strip(), mode="eval").body)
@@ -0,0 +1,80 @@
+"""
+Shared pytest fixtures for the regression tests
+"""
+import os
+from types import SimpleNamespace
+
+import pytest
+
+# Small deterministic corpus indexed once per session so search has something to hit
+SEED_NOTES = [
+    {
+        "title": "Authentication bug in login service",
+        "tags": ["bug", "authentication", "login"],
+        "body": "Users get logged out after a password reset. Fix the authentication bug in the login service token refresh.",
+        "enrichment": {"entities": ["authentication", "login service"]}
+    },
+    {
+        "title": "Meeting with Sarah about memory consolidation",
+        "tags": ["meeting", "research", "memory"],
+        "body": "Met with Sarah to discuss memory consolidation research and how the hippocampus replays memories during sleep.",
+        "enrichment": {"people": ["Sarah"], "entities": ["memory consolidation", "hippocampus"]}
+    },
+    {
+        "title": "FAISS for vector search",
+        "tags": ["idea", "faiss", "search"],
+        "body": "What if we used FAISS for vector search instead of manual linking? Excited to benchmark it.",
+        "enrichment": {"entities": ["FAISS", "vector search"], "emotions": ["excited"]}
+    },
+    {
+        "title": "AWS infrastructure review",
+        "tags": ["meeting", "aws", "infrastructure"],
+        "body": "Reviewed the AWS infrastructure costs with the platform team. Need to right-size the database instances.",
+        "enrichment": {"entities": ["AWS", "infrastructure"]}
+    },
+]
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "unit: fast tests that never call the LLM")
+    config.addinivalue_line("markers", "slow: tests that call the LLM (deselect with -m \"not slow\")")
+
+
+@pytest.fixture(scope="session")
+def setup_test_env(tmp_path_factory):
+    """Setup test environment with an in-memory, pre-seeded database (once per session)
+
+    Yields the notes dir and the seeded note IDs keyed by title.
+    """
+    import api.config as config
+    from api.db import ensure_db
+    from api.notes import write_markdown
+    from api.legacy.graph import index_note_with_enrichment
+
+    # pytest's session temp dir (per xdist worker); pytest prunes old ones itself
+    test_notes_dir = tmp_path_factory.mktemp("notes")
+
+    # The index lives in a shared-cache in-memory database (no file, no fsync);
+    # it exists only while a connection is open, so hold one for the session
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    test_db_uri = f"file:note_assistant_test_{worker}?mode=memory&cache=shared"
+    keepalive = config.connect_db(test_db_uri)
+
+    # Point the notes dir / database at the test locations for this context only
+    with config.use_notes_dir(test_notes_dir, db_path=test_db_uri):
+        # Initialize test database and index the seed corpus (text + entities) on one connection
+        ensure_db()
+        note_ids = {}
+        con = config.get_db_connection()
+        try:
+            for note in SEED_NOTES:
+                note_id, _, _ = write_markdown(note["title"], note["tags"], note["body"], db_connection=con)
+                index_note_with_enrichment(note_id, note["enrichment"], db_connection=con)
+                note_ids[note["title"]] = note_id
+            con.commit()
+        finally:
+            con.close()
+
+        yield SimpleNamespace(notes_dir=test_notes_dir, note_ids=note_ids)
+
+    keepalive.close()
@@ -9,10 +9,10 @@ Tests the full flow:
 4. Check link quality
 """
 import asyncio
+import functools
 import requests
-import sqlite3
 from datetime import datetime
-from api.config import DB_PATH
+from api.config import get_db_connection
 from api.graph import get_linked_notes, get_backlinks
 
 
@@ -21,7 +21,7 @@ BASE_URL = "http://127.0.0.1:8787"
 
 def clear_today_notes():
     """Clear today's test notes from database"""
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
 
     today = datetime.now().astimezone().replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
@@ -70,7 +70,7 @@ def run_consolidation() -> dict:
 
 def get_note_id_from_path(path: str) -> str:
     """Lookup note ID from path"""
-    con = sqlite3.connect(DB_PATH)
+    con = get_db_connection()
     cur = con.cursor()
     cur.execute("SELECT id FROM notes_meta WHERE path = ?", (path,))
     row = cur.fetchone()
@@ -78,10 +78,22 @@ def get_note_id_from_path(path: str) -> str:
     return row[0] if row else None
 
 
+@functools.lru_cache(maxsize=256)
+def _cached_linked_notes(note_id: str) -> tuple:
+    """Outgoing links for a note, memoized (graph is static after consolidation)"""
+    return tuple(get_linked_notes(note_id))
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_backlinks(note_id: str) -> tuple:
+    """Incoming links for a note, memoized (graph is static after consolidation)"""
+    return tuple(get_backlinks(note_id))
+
+
 def check_links(note_id: str):
     """Check links for a note"""
-    outgoing = get_linked_notes(note_id)
-    incoming = get_backlinks(note_id)
+    outgoing = list(_cached_linked_notes(note_id))
+    incoming = list(_cached_backlinks(note_id))
 
     return {
         "outgoing": outgoing,
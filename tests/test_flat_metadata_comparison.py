@@ -20,8 +20,15 @@ import time
 from pathlib import Path
 from typing import List, Dict, Tuple
 
-# Add project root to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+try:
+    import orjson
+except ImportError:  # stdlib json fallback
+    orjson = None
+
+# pytest.ini puts the repo root on sys.path; a direct script run doesn't read
+# it, so make the repo root importable here
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from api.llm.client import get_llm
 from api.llm.prompts import Prompts
@@ -188,6 +195,25 @@ Return ONLY the JSON object with all fields. No additional text.
 JSON:"""
 
 
+# Boolean dimensions in bit order: (metadata key, mapped folder, table legend letter)
+DIMENSIONS = (
+    ('has_action_items', 'tasks', 'T'),
+    ('is_social', 'meetings', 'M'),
+    ('is_emotional', 'journal', 'J'),
+    ('is_knowledge', 'reference', 'R'),
+    ('is_exploratory', 'ideas', 'I'),
+)
+
+
+def pack_dimensions(metadata: Dict) -> int:
+    """Pack the boolean dimensions into one int (bit i = DIMENSIONS[i])."""
+    bits = 0
+    for i, (key, _, _) in enumerate(DIMENSIONS):
+        if metadata.get(key):
+            bits |= 1 << i
+    return bits
+
+
 async def test_single_note_both_approaches(note_path: str) -> Dict:
     """Test both approaches on a single note."""
 
@@ -275,13 +301,9 @@ async def test_single_note_both_approaches(note_path: str) -> Dict:
     print(f"Time: {metadata_time:.2f}s")
 
     # Map metadata to expected folder
+    dims_bits = pack_dimensions(metadata_json)
     if metadata_json:
-        inferred_folders = []
-        if metadata_json.get('has_action_items'): inferred_folders.append('tasks')
-        if metadata_json.get('is_social'): inferred_folders.append('meetings')
-        if metadata_json.get('is_emotional'): inferred_folders.append('journal')
-        if metadata_json.get('is_knowledge'): inferred_folders.append('reference')
-        if metadata_json.get('is_exploratory'): inferred_folders.append('ideas')
+        inferred_folders = [folder for i, (_, folder, _) in enumerate(DIMENSIONS) if dims_bits >> i & 1]
 
         print(f"Inferred folder(s) from metadata: {inferred_folders}")
         print(f"Actual folder: {actual_folder}")
@@ -304,6 +326,7 @@ async def test_single_note_both_approaches(note_path: str) -> Dict:
             'time': metadata_time,
             'raw_response': metadata_response,
             'parsed': metadata_json,
+            'dims_bits': dims_bits,
             'inferred_folders': inferred_folders if metadata_json else [],
             'match': actual_folder in inferred_folders if metadata_json else False
         }
@@ -368,14 +391,9 @@ async def run_comparison_test(note_paths: List[str]):
         actual = r['actual_folder']
         classify_pred = r['classify']['predicted_folder']
 
-        # Get active dimensions
-        meta_dims = []
-        if r['metadata']['parsed']:
-            if r['metadata']['parsed'].get('has_action_items'): meta_dims.append('T')
-            if r['metadata']['parsed'].get('is_social'): meta_dims.append('M')
-            if r['metadata']['parsed'].get('is_emotional'): meta_dims.append('J')
-            if r['metadata']['parsed'].get('is_knowledge'): meta_dims.append('R')
-            if r['metadata']['parsed'].get('is_exploratory'): meta_dims.append('I')
+        # Get active dimensions from the packed bitmask
+        bits = r['metadata']['dims_bits']
+        meta_dims = [letter for i, (_, _, letter) in enumerate(DIMENSIONS) if bits >> i & 1]
         meta_str = ','.join(meta_dims) if meta_dims else 'none'
 
         # Add checkmarks for matches
@@ -388,8 +406,11 @@ async def run_comparison_test(note_paths: List[str]):
 
     # Save detailed results to file
     output_file = Path(__file__).parent / "flat_metadata_test_results.json"
-    with open(output_file, 'w') as f:
-        json.dump(results, f, indent=2)
+    if orjson is not None:
+        output_file.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_file, 'w') as f:
+            json.dump(results, f, indent=2)
 
     print(f"\n\nDetailed results saved to: {output_file}")
 
@@ -9,6 +9,47 @@ from agents import Agent, Runner, function_tool
 from agents.extensions.models.litellm_model import LitellmModel
 import json
 
+# Static tool schema for the direct LiteLLM test (built once, reused every turn)
+CALCULATE_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "calculate",
+            "description": "Calculate a mathematical expression",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "expression": {
+                        "type": "string",
+                        "description": "The math expression"
+                    }
+                },
+                "required": ["expression"]
+            }
+        }
+    }
+]
+
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a calculator. Use the calculate tool when asked to do math."
+}
+
+
+def tool_call_message(tc) -> dict:
+    """Build the assistant history entry for a single tool call"""
+    return {
+        "role": "assistant",
+        "tool_calls": [{
+            "id": tc.id,
+            "type": "function",
+            "function": {
+                "name": tc.function.name,
+                "arguments": tc.function.arguments
+            }
+        }]
+    }
+
 @function_tool
 def calculate(expression: str) -> str:
     """Calculate a mathematical expression."""
@@ -78,31 +119,8 @@ async def test_direct_litellm_with_gemma():
     print("Testing gemma3:4b directly with LiteLLM")
     print("="*60)
 
-    tools = [
-        {
-            "type": "function",
-            "function": {
-                "name": "calculate",
-                "description": "Calculate a mathematical expression",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "expression": {
-                            "type": "string",
-                            "description": "The math expression"
-                        }
-                    },
-                    "required": ["expression"]
-                }
-            }
-        }
-    ]
-
     messages = [
-        {
-            "role": "system",
-            "content": "You are a calculator. Use the calculate tool when asked to do math."
-        },
+        SYSTEM_MESSAGE,
         {
             "role": "user",
             "content": "Calculate 50 + 50"
@@ -117,7 +135,7 @@ async def test_direct_litellm_with_gemma():
         response = await litellm.acompletion(
             model="ollama/gemma3:4b",
             messages=messages,
-            tools=tools,
+            tools=CALCULATE_TOOLS,
             tool_choice="auto"
         )
 
@@ -130,17 +148,7 @@ async def test_direct_litellm_with_gemma():
                 print(f"  Arguments: {tc.function.arguments}")
 
                 # Add assistant message with tool call
-                messages.append({
-                    "role": "assistant",
-                    "tool_calls": [{
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.function.name,
-                            "arguments": tc.function.arguments
-                        }
-                    }]
-                })
+                messages.append(tool_call_message(tc))
 
                 # Execute and add tool result
                 args = json.loads(tc.function.arguments)
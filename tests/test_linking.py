@@ -3,75 +3,60 @@
 Test linking system with detailed LLM decision output
 """
 import asyncio
+import contextlib
+import io
 import json
+import re
+import sys
+
 from api.consolidation_service import (
     get_notes_created_today,
     find_link_candidates,
     suggest_links_batch
 )
 from api.capture_service import get_llm
+from _concurrent_output import OutputWriter
+from _tool_helpers import json_loads
 
 
-async def test_linking_with_debug():
-    """Test linking and show LLM's reasoning"""
+# Max concurrent LLM calls (keep in line with Ollama's OLLAMA_NUM_PARALLEL)
+MAX_CONCURRENT_LLM_CALLS = 8
 
-    notes = get_notes_created_today()
+# Reasons matching any of these are filtered as too vague (one compiled pass per reason)
+VAGUE_REASON_RE = re.compile(r"might be|could be|possibly|both mention|similar", re.IGNORECASE)
 
-    if not notes:
-        print("❌ No notes created today. Create some test notes first.")
-        return
 
-    print(f"📝 Found {len(notes)} notes created today\n")
-    print("=" * 80)
+def render_candidate_lines(candidates: list) -> list:
+    """Render each candidate once as a numbered entry for the linking prompt"""
+    return [
+        f"{i+1}. [{c['id']}] {c['title']}\n   Snippet: {c['snippet']}\n   Match: {c['match_reason']}"
+        for i, c in enumerate(candidates)
+    ]
 
-    for i, note in enumerate(notes, 1):
-        print(f"\n🔍 Testing Note {i}/{len(notes)}")
-        print(f"ID: {note['id']}")
-        print(f"Path: {note['path']}")
-        print(f"Body: {note['body'][:200]}...")
-        print()
 
-        # Find candidates with tag-based search
-        candidates = find_link_candidates(note, max_candidates=15, exclude_today=True)
-
-        print(f"🎯 Found {len(candidates)} candidates:")
-        for j, c in enumerate(candidates, 1):
-            note_id = c.get('id', 'unknown')
-            title = c.get('title', 'Untitled')
-            match_reason = c.get('match_reason', 'unknown')
-            snippet = c.get('snippet', '')
-
-            print(f"  {j}. [{note_id[:25]}...] {title[:60]}")
-            print(f"     Match reason: {match_reason}")
-            print(f"     Snippet: {snippet[:100]}...")
-            print()
-
-        if not candidates:
-            print("  ⚠️  No candidates found - skipping LLM analysis\n")
-            continue
-
-        # Show LLM prompt
-        print("📤 LLM Prompt Preview:")
-        print("-" * 80)
-        candidates_text = "\n".join([
-            f"{i+1}. [{c['id']}] {c['title']}\n   Snippet: {c['snippet']}\n   Match: {c['match_reason']}"
-            for i, c in enumerate(candidates[:3])
-        ])
-        print(f"NEW NOTE:\n{note['body'][:150]}...\n")
-        print(f"EXISTING NOTES (showing first 3):\n{candidates_text}\n")
-        print("-" * 80)
-
-        # Call LLM and show response
-        print("\n🤖 Calling LLM for link analysis...")
-        llm = get_llm()
+async def analyze_note(index: int, note: dict, semaphore: asyncio.Semaphore) -> dict:
+    """Find candidates for one note and ask the LLM which ones to link"""
+    # Find candidates with tag-based search (sync DB access, keep it off the event loop)
+    candidates = await asyncio.to_thread(
+        find_link_candidates, note, max_candidates=15, exclude_today=True
+    )
+
+    analysis = {
+        "index": index,
+        "note": note,
+        "candidates": candidates,
+        "response": None,
+        "links": None,
+        "candidate_lines": render_candidate_lines(candidates)
+    }
+
+    if not candidates:
+        return analysis
 
-        # Build full prompt (same as suggest_links_batch)
-        candidates_full = "\n".join([
-            f"{i+1}. [{c['id']}] {c['title']}\n   Snippet: {c['snippet']}\n   Match: {c['match_reason']}"
-            for i, c in enumerate(candidates)
-        ])
+    # Build full prompt (same as suggest_links_batch)
+    candidates_full = "\n".join(analysis["candidate_lines"])
 
-        prompt = f"""You are a knowledge graph linker. Analyze connections between notes.
+    prompt = f"""You are a knowledge graph linker. Analyze connections between notes.
 
 NEW NOTE:
 {note['body']}
@@ -102,43 +87,135 @@ Rules:
 
 JSON:"""
 
-        response = await llm.ainvoke(prompt)
+    async with semaphore:
+        llm = get_llm()
+        analysis["response"], analysis["links"] = await stream_links(llm, prompt)
+
+    return analysis
+
+
+async def stream_links(llm, prompt: str):
+    """Stream the LLM response, parsing as soon as the JSON array looks complete.
+
+    Returns (raw_text, parsed_links); parsed_links is None if the text never parsed.
+    """
+    parts = []
+    async for chunk in llm.astream(prompt):
+        parts.append(chunk.content)
+        # Only attempt a parse when the tail could close the array
+        if chunk.content.rstrip().endswith("]"):
+            text = "".join(parts)
+            try:
+                return text, json_loads(text)
+            except json.JSONDecodeError:
+                pass
+
+    return "".join(parts), None
+
+
+def report_analysis(analysis: dict, total: int):
+    """Print candidates, prompt preview, and LLM decision for one note"""
+    note = analysis["note"]
+    candidates = analysis["candidates"]
+
+    print(f"\n🔍 Testing Note {analysis['index']}/{total}")
+    print(f"ID: {note['id']}")
+    print(f"Path: {note['path']}")
+    print(f"Body: {note['body'][:200]}...")
+    print()
+
+    print(f"🎯 Found {len(candidates)} candidates:")
+    for j, c in enumerate(candidates, 1):
+        note_id = c.get('id', 'unknown')
+        title = c.get('title', 'Untitled')
+        match_reason = c.get('match_reason', 'unknown')
+        snippet = c.get('snippet', '')
+
+        print(f"  {j}. [{note_id[:25]}...] {title[:60]}")
+        print(f"     Match reason: {match_reason}")
+        print(f"     Snippet: {snippet[:100]}...")
+        print()
+
+    if not candidates:
+        print("  ⚠️  No candidates found - skipping LLM analysis\n")
+        print("\n" + "=" * 80)
+        return
+
+    # Show LLM prompt
+    print("📤 LLM Prompt Preview:")
+    print("-" * 80)
+    candidates_text = "\n".join(analysis["candidate_lines"][:3])
+    print(f"NEW NOTE:\n{note['body'][:150]}...\n")
+    print(f"EXISTING NOTES (showing first 3):\n{candidates_text}\n")
+    print("-" * 80)
 
-        print("\n📥 LLM Raw Response:")
-        print("-" * 80)
-        print(response.content)
-        print("-" * 80)
+    response = analysis["response"]
 
-        # Parse and validate
-        try:
-            result = json.loads(response.content)
-            print(f"\n✅ LLM suggested {len(result)} links:")
+    print("\n📥 LLM Raw Response:")
+    print("-" * 80)
+    print(response)
+    print("-" * 80)
 
-            if not result:
-                print("  ⚠️  No links suggested (all connections too weak)")
+    # Parse and validate
+    try:
+        result = analysis["links"]
+        if result is None:
+            result = json_loads(response)
+        print(f"\n✅ LLM suggested {len(result)} links:")
 
-            for link in result:
-                print(f"\n  📎 Link: {link.get('link_type', 'unknown').upper()}")
-                print(f"     To: [{link.get('id', 'unknown')[:25]}...]")
-                print(f"     Reason: {link.get('reason', 'no reason provided')}")
+        if not result:
+            print("  ⚠️  No links suggested (all connections too weak)")
 
-                # Validate
-                valid_ids = {c["id"] for c in candidates}
-                if link.get("id") not in valid_ids:
-                    print(f"     ❌ Invalid ID (not in candidates)")
+        valid_ids = {c["id"] for c in candidates}
+        for link in result:
+            print(f"\n  📎 Link: {link.get('link_type', 'unknown').upper()}")
+            print(f"     To: [{link.get('id', 'unknown')[:25]}...]")
+            print(f"     Reason: {link.get('reason', 'no reason provided')}")
 
-                # Check heuristic filtering
-                reason_lower = link.get("reason", "").lower()
-                vague_keywords = ["might be", "could be", "possibly", "both mention", "similar"]
-                if any(kw in reason_lower for kw in vague_keywords):
-                    print(f"     ⚠️  Would be filtered (vague reason)")
-                else:
-                    print(f"     ✅ Passes heuristic filter")
+            # Validate
+            if link.get("id") not in valid_ids:
+                print(f"     ❌ Invalid ID (not in candidates)")
 
-        except json.JSONDecodeError as e:
-            print(f"\n❌ Failed to parse LLM response as JSON: {e}")
+            # Check heuristic filtering
+            if VAGUE_REASON_RE.search(link.get("reason", "")):
+                print(f"     ⚠️  Would be filtered (vague reason)")
+            else:
+                print(f"     ✅ Passes heuristic filter")
 
-        print("\n" + "=" * 80)
+    except json.JSONDecodeError as e:
+        print(f"\n❌ Failed to parse LLM response as JSON: {e}")
+
+    print("\n" + "=" * 80)
+
+
+async def test_linking_with_debug():
+    """Test linking and show LLM's reasoning"""
+
+    notes = get_notes_created_today()
+
+    if not notes:
+        print("❌ No notes created today. Create some test notes first.")
+        return
+
+    print(f"📝 Found {len(notes)} notes created today\n")
+    print("=" * 80)
+    print("\n🤖 Calling LLM for link analysis (all notes concurrently)...")
+
+    # Notes are independent: run all analyses concurrently, report as each finishes
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+    tasks = [analyze_note(i, note, semaphore) for i, note in enumerate(notes, 1)]
+
+    writer = OutputWriter(sys.stdout)
+    try:
+        for finished in asyncio.as_completed(tasks):
+            analysis = await finished
+            # Render the report in memory; the writer task does the actual stdout I/O
+            report = io.StringIO()
+            with contextlib.redirect_stdout(report):
+                report_analysis(analysis, len(notes))
+            writer.write(report.getvalue())
+    finally:
+        await writer.close()
 
 
 if __name__ == "__main__":
@@ -6,14 +6,30 @@ This tests if the model knows when to stop calling tools
 
 import asyncio
 import json
+import re
+import copy
+import functools
+import httpx
 import litellm
+from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from _concurrent_output import OutputWriter, buffered_stdout, run_to_writer
+from _tool_helpers import evaluate_expression, json_dumps, json_loads
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback
+    orjson = None
 
 # Configure LiteLLM
 import os
 os.environ['LITELLM_LOG'] = 'INFO'
 
+# Keep the model (and its cached prompt prefix) loaded in Ollama between calls
+OLLAMA_KEEP_ALIVE = "30m"
+
 # Define tools
 tools = [
     {
@@ -92,13 +108,103 @@ FINAL_TOOL = {
 # Add final_answer to the tools list
 tools.append(FINAL_TOOL)
 
+# Shared tool lists, built once instead of per call
+FINAL_TOOL_LIST = [FINAL_TOOL]  # Synthesis: only final_answer available
+NO_TOOLS = []                   # Planning: no tools available
+
+# ========================================================
+# CONFIGURATION - Easy to modify for testing new models
+# ========================================================
+
+# Add or remove models here - just update this list!
+MODELS_TO_TEST = [
+    {
+        "model_name": "gemma3:4b",        # Actual model name in Ollama
+        "display_name": "Gemma 3 (4B)",   # Pretty name for display
+        "max_turns": 5                     # Max turns before giving up
+    },
+    {
+        "model_name": "qwen3:4b-instruct",
+        "display_name": "Qwen 3 (4B)",
+        "max_turns": 5
+    },
+    # {
+    #     "model_name": "qwen3:8b",        # Actual model name in Ollama
+    #     "display_name": "Qwen 3 (8B)",   # Pretty name for display
+    #     "max_turns": 5                     # Max turns before giving up
+    # },
+    # Add more models here:
+    # {
+    #     "model_name": "llama3.2",
+    #     "display_name": "Llama 3.2",
+    #     "max_turns": 5
+    # },
+    # {
+    #     "model_name": "mistral",
+    #     "display_name": "Mistral 7B",
+    #     "max_turns": 5
+    # },
+]
+
+_registered_models = set()
+
+def register_models(models_config):
+    """Tell LiteLLM these Ollama models support function calling (once per model)"""
+    model_registration = {
+        f"ollama/{config['model_name']}": {"supports_function_calling": True}
+        for config in models_config
+        if f"ollama/{config['model_name']}" not in _registered_models
+    }
+    if model_registration:
+        litellm.register_model(model_cost=model_registration)
+        _registered_models.update(model_registration)
+
+# Register up front so the first LLM call doesn't pay for it
+litellm.suppress_debug_info = True
+register_models(MODELS_TO_TEST)
+
+# Shared keep-alive HTTP client for LiteLLM (same pooling settings as api/llm/client.py).
+# The ollama provider ignores litellm.aclient_session, so every acompletion call
+# passes it explicitly as client=, wrapped in LiteLLM's AsyncHTTPHandler.
+_http_client: Optional[AsyncHTTPHandler] = None
+
+def get_http_client() -> AsyncHTTPHandler:
+    """Get or create the pooled HTTP client LiteLLM calls pass as client="""
+    global _http_client
+    if _http_client is None:
+        _http_client = AsyncHTTPHandler()
+        _http_client.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=32,
+                keepalive_expiry=30.0
+            ),
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+    return _http_client
+
+async def close_http_client():
+    """Close the pooled HTTP client"""
+    global _http_client
+    if _http_client:
+        await _http_client.client.aclose()
+        _http_client = None
+
+# Mock weather data (built once; get_weather hands out copies)
+WEATHER_DATA = {
+    "London": {"temp": "15°C", "condition": "Cloudy"},
+    "Tokyo": {"temp": "22°C", "condition": "Sunny"},
+    "New York": {"temp": "18°C", "condition": "Partly cloudy"},
+}
+DEFAULT_WEATHER = {"temp": "20°C", "condition": "Clear"}
+
 # Tool implementations
 def calculate(expression: str = "") -> Dict:
     """Execute calculation"""
     if not expression:
         return {"error": "No expression provided"}
     try:
-        result = eval(expression, {"__builtins__": {}})
+        result = evaluate_expression(expression)
         return {"expression": expression, "result": result}
     except Exception as e:
         return {"error": str(e)}
@@ -116,19 +222,14 @@ def get_weather(city: str = "") -> Dict:
     """Get mock weather data"""
     if not city:
         return {"error": "No city provided"}
-    weather_data = {
-        "London": {"temp": "15°C", "condition": "Cloudy"},
-        "Tokyo": {"temp": "22°C", "condition": "Sunny"},
-        "New York": {"temp": "18°C", "condition": "Partly cloudy"},
-    }
-    return weather_data.get(city, {"temp": "20°C", "condition": "Clear"})
+    return dict(WEATHER_DATA.get(city, DEFAULT_WEATHER))
 
 # Tool execution
 def execute_tool(tool_name: str, arguments: Dict) -> str:
     """Execute a tool and return the result"""
     # Handle final_answer specially - it's a control flow tool, not a real tool
     if tool_name == "final_answer":
-        return json.dumps({"ok": True, "answer": arguments.get("answer", "")})
+        return json_dumps({"ok": True, "answer": arguments.get("answer", "")})
 
     tool_map = {
         "calculate": calculate,
@@ -137,17 +238,80 @@ def execute_tool(tool_name: str, arguments: Dict) -> str:
     }
 
     if tool_name not in tool_map:
-        return json.dumps({"error": f"Unknown tool: {tool_name}"})
+        return json_dumps({"error": f"Unknown tool: {tool_name}"})
 
     try:
         # Let Python handle argument matching - it will raise TypeError if args don't match
         result = tool_map[tool_name](**arguments)
-        return json.dumps(result)
+        return json_dumps(result)
     except TypeError as e:
         # Handle missing/extra arguments gracefully
-        return json.dumps({"error": f"Invalid arguments for {tool_name}: {str(e)}"})
+        return json_dumps({"error": f"Invalid arguments for {tool_name}: {str(e)}"})
     except Exception as e:
-        return json.dumps({"error": f"Error executing {tool_name}: {str(e)}"})
+        return json_dumps({"error": f"Error executing {tool_name}: {str(e)}"})
+
+@functools.lru_cache(maxsize=256)
+def _parse_arguments(arguments: str) -> Dict:
+    return json_loads(arguments)
+
+def parse_tool_arguments(arguments: str) -> Dict:
+    """Parse a tool call's JSON arguments (memoized; raises json.JSONDecodeError)"""
+    parsed = _parse_arguments(arguments)
+    # Hand out a copy so callers can't mutate the cached value
+    return dict(parsed) if isinstance(parsed, dict) else parsed
+
+def assistant_tool_call_message(message) -> Dict:
+    """Minimal history entry for an assistant tool-call turn (avoids a full model_dump)"""
+    return {
+        "role": "assistant",
+        "content": message.content,
+        "tool_calls": [
+            {
+                "id": tc.id,
+                "type": "function",
+                "function": {
+                    "name": tc.function.name,
+                    "arguments": tc.function.arguments
+                }
+            }
+            for tc in message.tool_calls or []
+        ]
+    }
+
+# Pure arithmetic finishes in microseconds - cheaper to evaluate inline than to
+# hop to a worker thread
+INLINE_TOOLS = frozenset({"calculate", "final_answer"})
+
+async def aexecute_tool(tool_name: str, arguments: Dict) -> str:
+    """Execute a tool in a worker thread so independent tools can run concurrently"""
+    if tool_name in INLINE_TOOLS:
+        return execute_tool(tool_name, arguments)
+    return await asyncio.to_thread(execute_tool, tool_name, arguments)
+
+def tool_key(tool_name: str, arguments: Dict) -> bytes:
+    """Dedup key for a tool invocation: tool name + sorted-key JSON arguments, as bytes"""
+    if orjson is not None:
+        try:
+            return f"{tool_name}|".encode() + orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass
+    return f"{tool_name}|{json.dumps(arguments, sort_keys=True)}".encode()
+
+# Obvious tool triggers worth prefetching while the planner runs: (pattern, tool, argument name)
+SPECULATIVE_TRIGGERS = [
+    (re.compile(r"\bweather in ([A-Z][a-z]+(?: [A-Z][a-z]+)?)"), "get_weather", "city"),
+    (re.compile(r"\bcalculate ([\d\s.+\-*/()]*\d\)?)", re.IGNORECASE), "calculate", "expression"),
+]
+
+def speculate_tools(query: str) -> Dict[bytes, tuple]:
+    """Guess tool calls the planner is likely to emit, keyed like tool_key()"""
+    guesses = {}
+    for pattern, tool_name, arg_name in SPECULATIVE_TRIGGERS:
+        match = pattern.search(query)
+        if match:
+            args = {arg_name: match.group(1).strip()}
+            guesses[tool_key(tool_name, args)] = (tool_name, args)
+    return guesses
 
 # ReAct-style planning system for multi-tool scenarios
 PLAN_SYSTEM = """You are planning tool use.
@@ -198,8 +362,72 @@ Rules:
 - Do not execute tools, only plan
 - Output ONLY the JSON, no other text"""
 
+# Plan cache: (model, normalized query) -> plan. Set PLAN_CACHE=0 to disable for repro runs.
+PLAN_CACHE_ENABLED = os.getenv("PLAN_CACHE", "1") != "0"
+PLAN_CACHE_SIZE = 128
+_plan_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+
+def _plan_cache_key(query: str, model: str) -> tuple:
+    """Normalize case and whitespace so trivially rephrased queries share a plan"""
+    return (model, " ".join(query.lower().split()))
+
 async def get_tool_plan(query: str, model: str):
-    """Get a structured plan for tool usage"""
+    """Get a structured plan for tool usage (cached per model and query)"""
+    key = _plan_cache_key(query, model)
+    if PLAN_CACHE_ENABLED and key in _plan_cache:
+        _plan_cache.move_to_end(key)
+        print(f"\n📝 === PLANNING PHASE (cached) ===")
+        print(f"   Query: {query}")
+        return copy.deepcopy(_plan_cache[key])
+
+    plan = await _request_tool_plan(query, model)
+
+    if PLAN_CACHE_ENABLED:
+        _plan_cache[key] = copy.deepcopy(plan)
+        if len(_plan_cache) > PLAN_CACHE_SIZE:
+            _plan_cache.popitem(last=False)
+    return plan
+
+async def stream_json_object(**completion_kwargs) -> str:
+    """Stream a completion and stop as soon as the first top-level JSON object closes.
+
+    Returns the text received so far (including any leading markdown fence).
+    """
+    resp = await litellm.acompletion(stream=True, client=get_http_client(), **completion_kwargs)
+    text = ""
+    depth = 0
+    in_string = False
+    escaped = False
+    try:
+        async for chunk in resp:
+            delta = chunk.choices[0].delta.content or ""
+            start = len(text)
+            text += delta
+            for pos, ch in enumerate(delta, start):
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif ch == "\\":
+                        escaped = True
+                    elif ch == '"':
+                        in_string = False
+                elif ch == '"' and depth:
+                    in_string = True
+                elif ch == "{":
+                    depth += 1
+                elif ch == "}" and depth:
+                    depth -= 1
+                    if depth == 0:
+                        return text[:pos + 1]
+    finally:
+        # Stop reading the rest of the generation
+        aclose = getattr(resp, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    return text
+
+async def _request_tool_plan(query: str, model: str):
+    """Ask the model for a structured plan for tool usage"""
     messages = [
         {"role": "system", "content": PLAN_SYSTEM},
         {"role": "user", "content": f"User query: {query}\n\nPlan your steps as JSON."}
@@ -211,16 +439,16 @@ async def get_tool_plan(query: str, model: str):
     try:
         # First attempt
         print("\n   🤖 First planning attempt...")
-        resp = await litellm.acompletion(
+        text = await stream_json_object(
             model=model,
             messages=messages,
-            tools=[],  # No tools available during planning
+            tools=NO_TOOLS,  # No tools available during planning
             tool_choice="none",
             temperature=0.1,
-            max_tokens=500
+            max_tokens=500,
+            keep_alive=OLLAMA_KEEP_ALIVE
         )
-
-        text = resp.choices[0].message.content.strip()
+        text = text.strip()
         print(f"   📄 AI Response (raw):\n   {'-'*40}")
         print(f"   {text}")
         print(f"   {'-'*40}")
@@ -233,7 +461,7 @@ async def get_tool_plan(query: str, model: str):
             text = text[:-3]
         text = text.strip()
 
-        plan = json.loads(text)
+        plan = json_loads(text)
         assert "steps" in plan and isinstance(plan["steps"], list)
         print(f"   ✅ Successfully parsed plan with {len(plan['steps'])} steps")
         return plan
@@ -253,16 +481,16 @@ async def get_tool_plan(query: str, model: str):
         })
 
         print("\n   🤖 Second planning attempt (fallback)...")
-        resp = await litellm.acompletion(
+        text = await stream_json_object(
             model=model,
             messages=messages,
-            tools=[],
+            tools=NO_TOOLS,
             tool_choice="none",
             temperature=0.0,
-            max_tokens=500
+            max_tokens=500,
+            keep_alive=OLLAMA_KEEP_ALIVE
         )
-
-        text = resp.choices[0].message.content.strip()
+        text = text.strip()
         print(f"   📄 AI Response (fallback):\n   {'-'*40}")
         print(f"   {text}")
         print(f"   {'-'*40}")
@@ -272,7 +500,7 @@ async def get_tool_plan(query: str, model: str):
             if text.startswith("json"):
                 text = text[4:]
 
-        plan = json.loads(text.strip())
+        plan = json_loads(text.strip())
         print(f"   ✅ Fallback successful with {len(plan.get('steps', []))} steps")
         return plan
 
@@ -280,6 +508,12 @@ async def run_multi_tool(query: str, model: str):
     """Execute multi-tool queries using Plan → Execute → Synthesize approach"""
     print(f"\n🎯 Using ReAct multi-tool approach for: {query}")
 
+    # Speculatively prefetch obvious tool calls while the planner is thinking
+    speculative = {
+        key: asyncio.create_task(aexecute_tool(tool_name, tool_args))
+        for key, (tool_name, tool_args) in speculate_tools(query).items()
+    }
+
     # Step 1: Get the plan
     try:
         plan = await get_tool_plan(query, model)
@@ -290,6 +524,8 @@ async def run_multi_tool(query: str, model: str):
             print(f"   {i}. {step['tool']}: {step.get('why', '')}")
     except Exception as e:
         print(f"❌ Failed to create plan: {e}")
+        for task in speculative.values():
+            task.cancel()
         return None
 
     # Step 2: Execute each planned step deterministically
@@ -304,28 +540,43 @@ Do NOT call any other tools - just synthesize the results into a final answer.""
     ]
 
     # Track what we've already executed to avoid duplicates
-    executed = set()
-    tool_results = []
+    executed: set[bytes] = set()
+    pending = []
 
     for i, step in enumerate(steps, 1):
         tool_name = step.get("tool")
         tool_args = step.get("arguments", {}) or {}
 
         # Create a unique key for deduplication
-        exec_key = (tool_name, json.dumps(tool_args, sort_keys=True))
+        exec_key = tool_key(tool_name, tool_args)
         if exec_key in executed:
             print(f"   ⏭️  Skipping duplicate: {tool_name}")
             continue
         executed.add(exec_key)
+        pending.append((exec_key, tool_name, tool_args))
+
+    # Planned steps are independent - execute them all concurrently,
+    # reusing speculative results the plan agrees with
+    runs = []
+    for exec_key, tool_name, tool_args in pending:
+        if exec_key in speculative:
+            print(f"   ⚡ Reusing prefetched {tool_name} with {tool_args}")
+            runs.append(speculative.pop(exec_key))
+        else:
+            print(f"   ▶️  Executing {tool_name} with {tool_args}")
+            runs.append(aexecute_tool(tool_name, tool_args))
+    for task in speculative.values():
+        task.cancel()
+    results = await asyncio.gather(*runs)
 
-        # Execute the tool
-        print(f"   ▶️  Executing {tool_name} with {tool_args}")
-        result = execute_tool(tool_name, tool_args)
-        tool_results.append({
+    tool_results = [
+        {
             "tool": tool_name,
             "args": tool_args,
             "result": result
-        })
+        }
+        for (_, tool_name, tool_args), result in zip(pending, results)
+    ]
 
     # Step 3: Synthesize results into final answer
     print("\n📊 === SYNTHESIS PHASE ===")
@@ -355,10 +606,12 @@ Do NOT call any other tools - just synthesize the results into a final answer.""
     resp = await litellm.acompletion(
         model=model,
         messages=messages,
-        tools=[FINAL_TOOL],  # Only final_answer available
+        tools=FINAL_TOOL_LIST,  # Only final_answer available
         tool_choice="required",
         temperature=0.2,
-        max_tokens=400
+        max_tokens=400,
+        keep_alive=OLLAMA_KEEP_ALIVE,
+        client=get_http_client()
     )
 
     # Extract final answer
@@ -370,7 +623,7 @@ Do NOT call any other tools - just synthesize the results into a final answer.""
             print(f"   Tool Call: {tool_call.function.name}")
             print(f"   Arguments: {tool_call.function.arguments}")
             if tool_call.function.name == "final_answer":
-                args = json.loads(tool_call.function.arguments)
+                args = parse_tool_arguments(tool_call.function.arguments)
                 final_answer = args.get("answer", "")
                 print(f"\n✅ Final answer: {final_answer}")
                 return final_answer
@@ -382,32 +635,9 @@ Do NOT call any other tools - just synthesize the results into a final answer.""
     print("   ❌ No final answer provided")
     return None
 
-async def run_agentic_loop(query: str, model: str = "ollama/qwen3:4b-instruct", max_turns: int = 10, use_react: bool = False):
-    """Run an agentic loop with tool calling
-
-    Args:
-        query: The user query
-        model: The model to use
-        max_turns: Maximum number of turns before giving up
-        use_react: If True, use ReAct (Plan → Execute → Synthesize) approach
-    """
-    print(f"\nQuery: {query}")
-    print("="*60)
-
-    # Use ReAct approach if explicitly requested
-    if use_react:
-        print("🔄 Using ReAct approach")
-        result = await run_multi_tool(query, model)
-        if result:
-            return result
-        else:
-            print("⚠️ ReAct approach failed, falling back to standard approach")
-
-    # Initialize conversation with few-shot examples
-    messages = [
-        {
-            "role": "system",
-            "content": """You are a helpful assistant with access to tools.
+# System prompt for the agentic loop - kept byte-identical across calls so
+# Ollama can reuse the cached prefix
+AGENT_SYSTEM = """You are a helpful assistant with access to tools.
 
 CRITICAL INSTRUCTIONS:
 1. You may call multiple utility tools as needed to gather all required information
@@ -453,7 +683,35 @@ Tool Result: {"result": 10}
 Assistant: The answer is 10. ← WRONG! Must call final_answer tool
 
 Remember: After getting your result, always call final_answer to provide the answer."""
-        },
+
+# Shared (never mutated) system message - LiteLLM validates messages as plain
+# dicts, so it stays a dict rather than a MappingProxyType
+AGENT_SYSTEM_MESSAGE = {"role": "system", "content": AGENT_SYSTEM}
+
+async def run_agentic_loop(query: str, model: str = "ollama/qwen3:4b-instruct", max_turns: int = 10, use_react: bool = False):
+    """Run an agentic loop with tool calling
+
+    Args:
+        query: The user query
+        model: The model to use
+        max_turns: Maximum number of turns before giving up
+        use_react: If True, use ReAct (Plan → Execute → Synthesize) approach
+    """
+    print(f"\nQuery: {query}")
+    print("="*60)
+
+    # Use ReAct approach if explicitly requested
+    if use_react:
+        print("🔄 Using ReAct approach")
+        result = await run_multi_tool(query, model)
+        if result:
+            return result
+        else:
+            print("⚠️ ReAct approach failed, falling back to standard approach")
+
+    # Initialize conversation with few-shot examples
+    messages = [
+        AGENT_SYSTEM_MESSAGE,
         {
             "role": "user",
             "content": query
@@ -468,7 +726,9 @@ Remember: After getting your result, always call final_answer to provide the ans
             model=model,
             messages=messages,
             tools=tools,
-            tool_choice="auto"
+            tool_choice="auto",
+            keep_alive=OLLAMA_KEEP_ALIVE,
+            client=get_http_client()
         )
 
         assistant_message = response.choices[0].message
@@ -476,13 +736,13 @@ Remember: After getting your result, always call final_answer to provide the ans
         # Check if the assistant wants to use tools
         if assistant_message.tool_calls:
             print(f"Assistant wants to call tools:")
-            messages.append(assistant_message.model_dump())
+            messages.append(assistant_tool_call_message(assistant_message))
 
             # Execute each tool call
             for tool_call in assistant_message.tool_calls:
                 tool_name = tool_call.function.name
                 try:
-                    tool_args = json.loads(tool_call.function.arguments)
+                    tool_args = parse_tool_arguments(tool_call.function.arguments)
                 except json.JSONDecodeError:
                     tool_args = {}
                 print(f"  - Calling {tool_name} with {tool_args}")
@@ -534,14 +794,17 @@ Remember: After getting your result, always call final_answer to provide the ans
 async def main(models_config, test_queries):
     """Run tests with configured models and queries"""
 
-    # Register all models with LiteLLM
-    model_registration = {}
-    for config in models_config:
-        model_registration[f"ollama/{config['model_name']}"] = {
-            "supports_function_calling": True
-        }
-    litellm.register_model(model_cost=model_registration)
+    # Register any models not already registered at import
+    register_models(models_config)
 
+    get_http_client()
+    try:
+        await _run_models(models_config, test_queries)
+    finally:
+        await close_http_client()
+
+async def _run_models(models_config, test_queries):
+    """Run every query against every model and print the summary"""
     # Store results for summary
     all_results = {}
 
@@ -556,21 +819,38 @@ async def main(models_config, test_queries):
         successes = 0
         results = []
 
-        for query, use_react in test_queries:
-            result = await run_agentic_loop(
-                query,
-                model=model_path,
-                max_turns=config.get("max_turns", 5),
-                use_react=use_react
-            )
+        # Queries are independent - run them concurrently, bounded by Ollama's parallelism
+        semaphore = asyncio.Semaphore(int(os.getenv("OLLAMA_NUM_PARALLEL", "4")))
+
+        async def run_query(query, use_react):
+            async with semaphore:
+                result = await run_agentic_loop(
+                    query,
+                    model=model_path,
+                    max_turns=config.get("max_turns", 5),
+                    use_react=use_react
+                )
+            if not result:
+                print("⚠️ Agent failed to provide final answer\n")
+            print("\n" + "-"*60)
+            return result
 
+        with buffered_stdout() as real_stdout:
+            writer = OutputWriter(real_stdout)
+            try:
+                query_results = await asyncio.gather(*(
+                    run_to_writer(run_query(query, use_react), writer)
+                    for query, use_react in test_queries
+                ))
+            finally:
+                await writer.close()
+
+        for result in query_results:
             if result:
                 successes += 1
                 results.append("✅")
             else:
                 results.append("❌")
-                print("⚠️ Agent failed to provide final answer\n")
-            print("\n" + "-"*60)
 
         all_results[config['display_name']] = {
             'successes': successes,
@@ -598,40 +878,6 @@ async def main(models_config, test_queries):
     print("\nFew-shot examples help models understand when to stop calling tools")
 
 if __name__ == "__main__":
-    # ========================================================
-    # CONFIGURATION - Easy to modify for testing new models
-    # ========================================================
-
-    # Add or remove models here - just update this list!
-    MODELS_TO_TEST = [
-        {
-            "model_name": "gemma3:4b",        # Actual model name in Ollama
-            "display_name": "Gemma 3 (4B)",   # Pretty name for display
-            "max_turns": 5                     # Max turns before giving up
-        },
-        {
-            "model_name": "qwen3:4b-instruct",
-            "display_name": "Qwen 3 (4B)",
-            "max_turns": 5
-        },
-        # {
-        #     "model_name": "qwen3:8b",        # Actual model name in Ollama
-        #     "display_name": "Qwen 3 (8B)",   # Pretty name for display
-        #     "max_turns": 5                     # Max turns before giving up
-        # },
-        # Add more models here:
-        # {
-        #     "model_name": "llama3.2",
-        #     "display_name": "Llama 3.2",
-        #     "max_turns": 5
-        # },
-        # {
-        #     "model_name": "mistral",
-        #     "display_name": "Mistral 7B",
-        #     "max_turns": 5
-        # },
-    ]
-
     # Test queries - can be modified as needed
     # Format: (query, use_react)
     TEST_QUERIES = [
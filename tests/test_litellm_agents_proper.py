@@ -5,13 +5,22 @@ Using the official LitellmModel extension
 """
 
 import asyncio
+import functools
+import json
 import os
+import time
 from datetime import datetime, timezone
+from types import MappingProxyType
 from typing import Dict
 import agentops
+import httpx
+import litellm
 from agents import Agent, Runner, function_tool, ModelSettings
 from agents.extensions.models.litellm_model import LitellmModel
+from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
 from dotenv import load_dotenv
+from _tool_helpers import evaluate_expression
+from _agentops_sessions import drain_session_ends, end_session_in_background, end_test_session
 
 # Load environment variables
 load_dotenv()
@@ -25,11 +34,105 @@ else:
     agentops.init()
     print("⚠️  AgentOps initialized without API key (local mode)")
 
+# Shared keep-alive HTTP client so every LiteLLM call (and the Ollama health
+# check) reuses pooled connections. The openai/ provider picks it up from
+# litellm.aclient_session; the ollama providers ignore that, so Ollama calls get
+# it passed as client= (via OLLAMA_EXTRA_ARGS, which LitellmModel forwards).
+OLLAMA_BASE_URL = "http://localhost:11434"
+HTTP_CLIENT = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_keepalive_connections=32,
+        max_connections=64,
+        keepalive_expiry=30.0
+    ),
+    timeout=httpx.Timeout(60.0, connect=5.0)
+)
+litellm.aclient_session = HTTP_CLIENT
+OLLAMA_HTTP_HANDLER = AsyncHTTPHandler()
+OLLAMA_HTTP_HANDLER.client = HTTP_CLIENT
+
+# ollama_chat uses Ollama's native chat/tool API (ollama/ goes through the
+# generate endpoint and templates tools into the prompt).
+# For perf runs against an OpenAI-compatible server with continuous batching
+# (e.g. vLLM started with --enable-prefix-caching), set
+#   AGENT_MODEL=openai/<served-model-name> AGENT_API_BASE=http://localhost:8000/v1
+AGENT_MODEL = os.getenv("AGENT_MODEL", "ollama_chat/qwen3:4b-instruct")
+AGENT_API_BASE = os.getenv("AGENT_API_BASE")
+USING_OLLAMA = AGENT_MODEL.startswith("ollama")
+litellm.register_model(model_cost={
+    AGENT_MODEL: {
+        "supports_function_calling": True
+    },
+})
+
+# One LiteLLM model shared by every agent and test
+# For Ollama, we don't need an API key, but LiteLLM might require a dummy one
+LITELLM_MODEL = LitellmModel(
+    model=AGENT_MODEL,
+    base_url=AGENT_API_BASE,
+    api_key=os.getenv("AGENT_API_KEY", "dummy")  # Ollama doesn't use API keys
+)
+
+# Max concurrent queries per test (keep in line with Ollama's OLLAMA_NUM_PARALLEL)
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+
+# Keep the model resident between tests and pin the context size so Ollama
+# reuses the loaded runner (and its prompt cache) instead of reloading
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "4096"))
+OLLAMA_EXTRA_ARGS = {
+    "keep_alive": OLLAMA_KEEP_ALIVE,
+    "num_ctx": OLLAMA_NUM_CTX,
+    "client": OLLAMA_HTTP_HANDLER,
+} if USING_OLLAMA else {}
+
 # ============================================================================
 # TOOL DEFINITIONS
 # ============================================================================
 
+# Mock weather data for testing (read-only, shared by all calls)
+WEATHER_DATA = MappingProxyType({
+    "London": MappingProxyType({"temp": "15°C", "condition": "Cloudy", "humidity": "70%"}),
+    "Tokyo": MappingProxyType({"temp": "22°C", "condition": "Sunny", "humidity": "55%"}),
+    "New York": MappingProxyType({"temp": "18°C", "condition": "Partly cloudy", "humidity": "60%"}),
+    "Paris": MappingProxyType({"temp": "17°C", "condition": "Rainy", "humidity": "80%"}),
+})
+DEFAULT_WEATHER = MappingProxyType({"temp": "20°C", "condition": "Clear", "humidity": "50%"})
+
+# (epoch second, UTC datetime) - the tools only report to the second
+_clock = (None, None)
+
+def utc_now() -> datetime:
+    """Current UTC time truncated to the second, rebuilt at most once per second"""
+    global _clock
+    second = int(time.time())
+    if _clock[0] != second:
+        _clock = (second, datetime.fromtimestamp(second, timezone.utc))
+    return _clock[1]
+
+def memoize_tool(fn):
+    """
+    Collapse repeated identical tool calls into one execution.
+
+    Results are keyed on the arguments and the current epoch second, so tools
+    that report the time stay accurate; entries from earlier seconds are dropped.
+    """
+    cache = {}
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        second = int(time.time())
+        key = (second, args, json.dumps(kwargs, sort_keys=True))
+        if key not in cache:
+            if cache and next(iter(cache))[0] != second:
+                cache.clear()
+            cache[key] = fn(*args, **kwargs)
+        return dict(cache[key])
+
+    return wrapper
+
 @function_tool
+@memoize_tool
 def get_current_time(timezone_name: str = "UTC") -> Dict:
     """
     Get the current date and time.
@@ -40,8 +143,7 @@ def get_current_time(timezone_name: str = "UTC") -> Dict:
     Returns:
         Dictionary with current time information
     """
-    from datetime import timezone as tz
-    now = datetime.now(tz.utc)
+    now = utc_now()
     return {
         "date": now.strftime("%Y-%m-%d"),
         "time": now.strftime("%H:%M:%S"),
@@ -51,6 +153,7 @@ def get_current_time(timezone_name: str = "UTC") -> Dict:
     }
 
 @function_tool
+@memoize_tool
 def calculate(expression: str) -> Dict:
     """
     Safely evaluate a mathematical expression.
@@ -62,8 +165,8 @@ def calculate(expression: str) -> Dict:
         Dictionary with calculation result
     """
     try:
-        # Safe evaluation
-        result = eval(expression, {"__builtins__": {}})
+        # Safe evaluation (arithmetic only)
+        result = evaluate_expression(expression)
         return {
             "expression": expression,
             "result": result,
@@ -73,6 +176,7 @@ def calculate(expression: str) -> Dict:
         return {"error": f"Failed to calculate: {str(e)}"}
 
 @function_tool
+@memoize_tool
 def get_weather(city: str) -> Dict:
     """
     Get weather information for a city (mock data for testing).
@@ -83,53 +187,37 @@ def get_weather(city: str) -> Dict:
     Returns:
         Dictionary with weather information
     """
-    # Mock weather data for testing
-    weather_data = {
-        "London": {"temp": "15°C", "condition": "Cloudy", "humidity": "70%"},
-        "Tokyo": {"temp": "22°C", "condition": "Sunny", "humidity": "55%"},
-        "New York": {"temp": "18°C", "condition": "Partly cloudy", "humidity": "60%"},
-        "Paris": {"temp": "17°C", "condition": "Rainy", "humidity": "80%"},
-    }
-
-    data = weather_data.get(city, {"temp": "20°C", "condition": "Clear", "humidity": "50%"})
+    data = WEATHER_DATA.get(city, DEFAULT_WEATHER)
     return {
         "city": city,
         "temperature": data["temp"],
         "condition": data["condition"],
         "humidity": data["humidity"],
         "wind": "10 km/h",
-        "observation_time": datetime.utcnow().isoformat()
+        "observation_time": utc_now().isoformat()
     }
 
 # ============================================================================
 # TEST SCENARIOS
 # ============================================================================
 
+# Shared, deliberately short rule set: every request prefills the instructions,
+# and a common leading sentence keeps the prompt prefix identical across agents
+TOOL_RULES = "Use tools for facts; never repeat a tool call; answer right after the tool result."
+
 async def test_single_agent_with_tools():
     """Test a single agent with multiple tools using LiteLLM"""
     print("\n" + "="*60)
     print("TEST 1: Single Agent with Tools (via LiteLLM)")
     print("="*60)
 
-    # Create LiteLLM model for Ollama
-    # For Ollama, we don't need an API key, but LiteLLM might require a dummy one
-    litellm_model = LitellmModel(
-        model="ollama/qwen3:4b-instruct",
-        api_key="dummy"  # Ollama doesn't use API keys
-    )
-
     # Create agent with LiteLLM model
     agent = Agent(
         name="Assistant",
-        instructions="""You are a helpful AI assistant with access to various tools.
-        You can tell time, perform calculations, and check weather.
-        Use the appropriate tools to answer user questions accurately.
-
-        IMPORTANT: After you receive a tool result, immediately provide a final answer to the user.
-        Do NOT call the same tool again. Use the tool result to formulate your response and stop.""",
-        model=litellm_model,
+        instructions=f"{TOOL_RULES} Tell time, calculate, and check weather.",
+        model=LITELLM_MODEL,
         tools=[get_current_time, calculate, get_weather],
-        model_settings=ModelSettings(include_usage=True)  # Track usage
+        model_settings=ModelSettings(include_usage=True, extra_args=OLLAMA_EXTRA_ARGS)  # Track usage
     )
 
     test_queries = [
@@ -138,30 +226,48 @@ async def test_single_agent_with_tools():
         "What's the weather in Tokyo?"
     ]
 
-    for query in test_queries:
-        print(f"\nQuery: {query}")
-        print("-" * 40)
-
-        session = agentops.start_session(tags={
-            "test": "single_agent",
-            "model": "ollama/qwen3:4b-instruct"
-        })
-
-        try:
-            result = await Runner.run(
+    async def run_query(query):
+        async with semaphore:
+            # Stream the run so time-to-first-token is measured separately
+            # from total latency
+            start = time.perf_counter()
+            ttft = None
+            result = Runner.run_streamed(
                 starting_agent=agent,
                 input=query
             )
-            print(f"Response: {result.final_output}")
+            async for event in result.stream_events():
+                if (ttft is None and event.type == "raw_response_event"
+                        and event.data.type == "response.output_text.delta"):
+                    ttft = time.perf_counter() - start
+            return result, ttft, time.perf_counter() - start
+
+    # One AgentOps session covers every query in this test
+    session = agentops.start_session(tags={
+        "test": "single_agent",
+        "model": AGENT_MODEL
+    })
 
-            # Check if usage info is available
-            if hasattr(result, 'usage'):
-                print(f"Usage: {result.usage}")
+    # Queries are independent - run them concurrently
+    semaphore = asyncio.Semaphore(OLLAMA_NUM_PARALLEL)
+    results = await asyncio.gather(*(run_query(q) for q in test_queries), return_exceptions=True)
+    end_test_session(session, results)
+
+    for query, result in zip(test_queries, results):
+        print(f"\nQuery: {query}")
+        print("-" * 40)
+
+        if isinstance(result, Exception):
+            print(f"Error: {result}")
+            continue
+
+        result, ttft, total = result
+        print(f"Response: {result.final_output}")
+        if ttft is not None:
+            print(f"TTFT: {ttft:.2f}s, total: {total:.2f}s")
 
-            agentops.end_session(session)
-        except Exception as e:
-            print(f"Error: {e}")
-            agentops.end_session(session, error=str(e))
+        # include_usage=True - the run's token usage is tracked on its context
+        print(f"Usage: {result.context_wrapper.usage}")
 
 async def test_multi_agent_handoff():
     """Test multiple agents with handoffs using LiteLLM"""
@@ -169,45 +275,30 @@ async def test_multi_agent_handoff():
     print("TEST 2: Multi-Agent Handoff (via LiteLLM)")
     print("="*60)
 
-    # Create LiteLLM model
-    litellm_model = LitellmModel(
-        model="ollama/qwen3:4b-instruct",
-        api_key="dummy"
-    )
-
     # Create specialized agents
     math_agent = Agent(
         name="Math Expert",
-        instructions="""You are a mathematics expert.
-        You can solve complex calculations and explain mathematical concepts.
-        Use the calculate tool to verify your answers.
-
-        IMPORTANT: After receiving the tool result, provide the final answer immediately.
-        Do NOT call the tool again for the same calculation.""",
-        model=litellm_model,
-        tools=[calculate]
+        instructions=f"{TOOL_RULES} You are a math expert; verify answers with calculate.",
+        model=LITELLM_MODEL,
+        tools=[calculate],
+        model_settings=ModelSettings(extra_args=OLLAMA_EXTRA_ARGS)
     )
 
     info_agent = Agent(
         name="Info Agent",
-        instructions="""You provide information about time and weather.
-        Use the available tools to give accurate, current information.
-
-        IMPORTANT: After receiving the tool result, provide the final answer immediately.
-        Do NOT call the tool again for the same request.""",
-        model=litellm_model,
-        tools=[get_current_time, get_weather]
+        instructions=f"{TOOL_RULES} You answer time and weather questions.",
+        model=LITELLM_MODEL,
+        tools=[get_current_time, get_weather],
+        model_settings=ModelSettings(extra_args=OLLAMA_EXTRA_ARGS)
     )
 
     # Create router agent with handoffs
     router = Agent(
         name="Router",
-        instructions="""You are a router that directs queries to the right specialist:
-        - Send math questions to 'Math Expert'
-        - Send time/weather questions to 'Info Agent'
-        Choose the appropriate specialist based on the user's question.""",
-        model=litellm_model,
-        handoffs=[math_agent, info_agent]
+        instructions="Hand off math to 'Math Expert' and time/weather to 'Info Agent'.",
+        model=LITELLM_MODEL,
+        handoffs=[math_agent, info_agent],
+        model_settings=ModelSettings(extra_args=OLLAMA_EXTRA_ARGS)
     )
 
     test_queries = [
@@ -216,25 +307,32 @@ async def test_multi_agent_handoff():
         "What's the weather in Paris?"
     ]
 
-    for query in test_queries:
-        print(f"\nQuery: {query}")
-        print("-" * 40)
-
-        session = agentops.start_session(tags={
-            "test": "multi_agent",
-            "model": "ollama/qwen3:4b-instruct"
-        })
-
-        try:
-            result = await Runner.run(
+    async def run_query(query):
+        async with semaphore:
+            return await Runner.run(
                 starting_agent=router,
                 input=query
             )
+
+    # One AgentOps session covers every query in this test
+    session = agentops.start_session(tags={
+        "test": "multi_agent",
+        "model": AGENT_MODEL
+    })
+
+    # Queries are independent - run them concurrently
+    semaphore = asyncio.Semaphore(OLLAMA_NUM_PARALLEL)
+    results = await asyncio.gather(*(run_query(q) for q in test_queries), return_exceptions=True)
+    end_test_session(session, results)
+
+    for query, result in zip(test_queries, results):
+        print(f"\nQuery: {query}")
+        print("-" * 40)
+
+        if isinstance(result, Exception):
+            print(f"Error: {result}")
+        else:
             print(f"Response: {result.final_output}")
-            agentops.end_session(session)
-        except Exception as e:
-            print(f"Error: {e}")
-            agentops.end_session(session, error=str(e))
 
 async def test_complex_query():
     """Test a complex query requiring multiple tools"""
@@ -242,24 +340,19 @@ async def test_complex_query():
     print("TEST 3: Complex Multi-Tool Query (via LiteLLM)")
     print("="*60)
 
-    # Create LiteLLM model
-    litellm_model = LitellmModel(
-        model="ollama/qwen3:4b-instruct",
-        api_key="dummy"
-    )
-
     # Create agent with all tools
     agent = Agent(
         name="Multi-Tool Assistant",
-        instructions="""You are a helpful assistant with multiple capabilities.
-        When asked complex questions, use multiple tools to provide comprehensive answers.
-        Always use tools to get accurate information.
-
-        IMPORTANT: After receiving tool results, compile them into a final answer.
-        Do NOT call the same tool multiple times. Once you have all needed information, provide a complete response.""",
-        model=litellm_model,
+        instructions=f"{TOOL_RULES} Request ALL needed tool calls in one response, then combine the results.",
+        model=LITELLM_MODEL,
         tools=[get_current_time, calculate, get_weather],
-        model_settings=ModelSettings(include_usage=True)
+        # Let the model emit every independent tool call in one turn; the Runner
+        # executes the calls from a single response concurrently
+        model_settings=ModelSettings(
+            include_usage=True,
+            parallel_tool_calls=True,
+            extra_args=OLLAMA_EXTRA_ARGS
+        )
     )
 
     complex_query = "What's the current time, the weather in London, and what's 15% of 200?"
@@ -269,7 +362,7 @@ async def test_complex_query():
 
     session = agentops.start_session(tags={
         "test": "complex",
-        "model": "ollama/qwen3:4b-instruct"
+        "model": AGENT_MODEL
     })
 
     try:
@@ -278,39 +371,63 @@ async def test_complex_query():
             input=complex_query
         )
         print(f"Response: {result.final_output}")
-        agentops.end_session(session)
+        end_session_in_background(session)
     except Exception as e:
         print(f"Error: {e}")
-        agentops.end_session(session, error=str(e))
+        end_session_in_background(session, error=str(e))
 
 # ============================================================================
 # MAIN
 # ============================================================================
 
+async def warm_up_model():
+    """Load the model weights with a 1-token request so the first test doesn't pay the cold start"""
+    try:
+        await litellm.acompletion(
+            model=AGENT_MODEL,
+            api_base=AGENT_API_BASE,
+            messages=[{"role": "user", "content": "ping"}],
+            max_tokens=1,
+            **OLLAMA_EXTRA_ARGS
+        )
+        print("✅ Model warmed up")
+    except Exception as e:
+        print(f"⚠️  Model warmup failed: {e}")
+
 async def main():
     """Run all tests"""
     print("\n" + "="*60)
     print("OpenAI Agents SDK + LiteLLM + Ollama Integration")
     print("Using official LitellmModel extension")
-    print("Model: qwen3:4b-instruct (via Ollama)")
+    print(f"Model: {AGENT_MODEL}" + (f" ({AGENT_API_BASE})" if AGENT_API_BASE else ""))
     print("="*60)
 
-    # Check if Ollama is running
-    import requests
+    # Check if the model server is running
+    if USING_OLLAMA:
+        health_url = f"{AGENT_API_BASE or OLLAMA_BASE_URL}/api/version"
+    else:
+        health_url = f"{AGENT_API_BASE}/models"
     try:
-        response = requests.get("http://localhost:11434/api/version", timeout=2)
+        response = await HTTP_CLIENT.get(health_url, timeout=2)
         if response.status_code == 200:
-            print("✅ Ollama is running")
+            print("✅ Model server is running")
         else:
-            print("⚠️  Ollama might not be running properly")
-    except:
-        print("❌ Ollama is not running. Please start it with: ollama serve")
+            print("⚠️  Model server might not be running properly")
+    except httpx.HTTPError:
+        print(f"❌ Model server is not reachable at {health_url}")
+        if USING_OLLAMA:
+            print("   Start Ollama with: ollama serve")
         return
 
+    await warm_up_model()
+
     # Run tests
-    await test_single_agent_with_tools()
-    await test_multi_agent_handoff()
-    await test_complex_query()
+    try:
+        await test_single_agent_with_tools()
+        await test_multi_agent_handoff()
+        await test_complex_query()
+    finally:
+        await drain_session_ends()
 
     print("\n" + "="*60)
     print("SUMMARY")
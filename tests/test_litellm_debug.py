@@ -4,23 +4,56 @@ Debug test for LiteLLM integration with OpenAI Agents SDK
 """
 
 import asyncio
+import os
+import time
+import litellm
+from litellm.caching.caching import Cache
 from agents import Agent, Runner, function_tool
 from agents.extensions.models.litellm_model import LitellmModel
 
+# Native chat/tool API rather than ollama/'s prompt-templated tools.
+# AGENT_MODEL / AGENT_API_BASE point the test at another OpenAI-compatible
+# server, e.g. vLLM with a speculative draft model, to check tool calls still parse.
+AGENT_MODEL = os.getenv("AGENT_MODEL", "ollama_chat/qwen3:4b-instruct")
+AGENT_API_BASE = os.getenv("AGENT_API_BASE")
+litellm.register_model(model_cost={
+    AGENT_MODEL: {
+        "supports_function_calling": True
+    },
+})
+
+# Response cache keyed on the full request (model, messages, tools, ...) so
+# re-running the same debug query skips inference. Set LLM_CACHE=0 to always hit the model.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+
+def enable_response_cache():
+    """Cache LiteLLM responses on disk (persists across runs), or in memory without diskcache"""
+    try:
+        litellm.cache = Cache(type="disk")
+        return "disk"
+    except ImportError:
+        litellm.cache = Cache(type="local")
+        return "memory"
+
+TIME_FORMAT = "%H:%M:%S"
+
 @function_tool
 def get_time() -> str:
     """Get the current time."""
-    from datetime import datetime
-    return f"The current time is {datetime.now().strftime('%H:%M:%S')}"
+    return f"The current time is {time.strftime(TIME_FORMAT)}"
 
 async def main():
     print("Testing LiteLLM integration...")
 
-    # Create LiteLLM model for Ollama
-    print("Creating LiteLLM model for ollama/qwen3:4b-instruct...")
+    if LLM_CACHE_ENABLED:
+        print(f"LLM response cache: {enable_response_cache()}")
+
+    # Create LiteLLM model (Ollama by default)
+    print(f"Creating LiteLLM model for {AGENT_MODEL}...")
     litellm_model = LitellmModel(
-        model="ollama/qwen3:4b-instruct",
-        api_key="dummy"  # Ollama doesn't use API keys
+        model=AGENT_MODEL,
+        base_url=AGENT_API_BASE,
+        api_key=os.getenv("AGENT_API_KEY", "dummy")  # Ollama doesn't use API keys
     )
 
     # Create simple agent
@@ -42,6 +75,11 @@ async def main():
             input=query
         )
         print(f"Success! Response: {result.final_output}")
+        tool_calls = [item for item in result.new_items if item.type == "tool_call_item"]
+        if tool_calls:
+            print(f"Tool calls parsed: {len(tool_calls)}")
+        else:
+            print("Warning: answered without calling get_time")
     except Exception as e:
         print(f"Error: {e}")
         import traceback
@@ -5,24 +5,53 @@ This confirms that qwen3:4b-instruct works with LiteLLM's tool calling interface
 """
 
 import asyncio
+import contextlib
+import contextvars
+import io
 import json
+import os
+import sys
+import time
+import httpx
 import litellm
 from litellm import completion, acompletion
+from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler, HTTPHandler
 import agentops
 
 # Initialize AgentOps for tracing
 agentops.init()
 
-# Configure LiteLLM for debugging
-litellm.set_verbose = True  # Enable debug output
+# LiteLLM request/response logging is synchronous and sits on every call's hot
+# path; AgentOps already traces each call. Set LITELLM_VERBOSE=1 to debug.
+litellm.set_verbose = os.getenv("LITELLM_VERBOSE") == "1"
+litellm.suppress_debug_info = not litellm.set_verbose
 
-# Register qwen3:4b-instruct with function calling support
+# Ollama model tag under test (same LLM_MODEL setting as api/config.py), so a
+# quantized build (e.g. LLM_MODEL=qwen3:4b-instruct-q4_K_M) can be checked for
+# tool-call regressions against the default
+OLLAMA_MODEL_NAME = os.getenv("LLM_MODEL", "qwen3:4b-instruct")
+LITELLM_MODEL = f"ollama_chat/{OLLAMA_MODEL_NAME}"
+
+# Register the model with function calling support
 litellm.register_model(model_cost={
-    "ollama_chat/qwen3:4b-instruct": {
+    LITELLM_MODEL: {
         "supports_function_calling": True
     },
 })
 
+# Shared keep-alive HTTP clients (sync + async) instead of LiteLLM's per-call defaults.
+# The ollama providers ignore litellm.(a)client_session, so each call passes
+# one of these as client=
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=30.0)
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+HTTP_HANDLER = HTTPHandler()
+HTTP_HANDLER.client = httpx.Client(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+ASYNC_HTTP_HANDLER = AsyncHTTPHandler()
+ASYNC_HTTP_HANDLER.client = httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+
+# Max concurrent requests (keep in line with Ollama's OLLAMA_NUM_PARALLEL)
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+
 # Define test tools matching our note organizer from test_llm_tools.py
 tools = [
     {
@@ -58,66 +87,141 @@ tools = [
     }
 ]
 
+# System prompts shared by every test case (built once, not per request).
+# The tools list above is module-level for the same reason; LiteLLM still
+# converts it to Ollama's format on each call, which is cheap next to inference.
+ASYNC_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a note organization assistant. Analyze the given text and organize it appropriately using the provided tool."
+}
+SYNC_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a note organization assistant. Use the organize_note tool to organize the given text."
+}
+
 # Test cases
 test_cases = [
     "Consider ALB public, Fargate private. Check ECR VPC endpoints issue. Need to review AWS networking setup for the new deployment.",
     "Met with Sarah from the design team about the new dashboard. She suggested using a card-based layout with real-time updates. Follow up next week.",
 ]
 
+# Per-context stdout buffer, so each concurrently running test prints its
+# output as one block (a single write) instead of interleaving line by line
+_captured_output: contextvars.ContextVar = contextvars.ContextVar("captured_output", default=None)
+
+class _ContextStdout:
+    """sys.stdout proxy that writes to the current context's buffer when one is set"""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text):
+        buffer = _captured_output.get()
+        return (buffer if buffer is not None else self._stream).write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+@contextlib.contextmanager
+def buffered_stdout():
+    """Buffer this context's prints and emit them in a single write on exit"""
+    buffer = io.StringIO()
+    token = _captured_output.set(buffer)
+    try:
+        yield
+    finally:
+        _captured_output.reset(token)
+        sys.stdout.write(buffer.getvalue())
+
+def run_captured(fn):
+    """Run fn with stdout buffered (one write for its whole output)"""
+    with buffered_stdout():
+        return fn()
+
+
 async def test_async_tool_calling():
     """Test async tool calling with LiteLLM + Ollama"""
     print("\n" + "="*60)
-    print("Testing Async Tool Calling: LiteLLM + Ollama + qwen3:4b-instruct")
+    print(f"Testing Async Tool Calling: LiteLLM + Ollama + {OLLAMA_MODEL_NAME}")
     print("="*60 + "\n")
 
     session = agentops.start_session(tags={
         "test": "litellm_ollama_integration",
-        "model": "qwen3:4b-instruct"
+        "model": OLLAMA_MODEL_NAME
     })
 
+    async def run_case(test_input):
+        messages = [
+            ASYNC_SYSTEM_MESSAGE,
+            {
+                "role": "user",
+                "content": f"Please organize this note: {test_input}"
+            }
+        ]
+
+        async with semaphore:
+            # Stream the completion so time-to-first-token is visible, then
+            # rebuild the full response (including tool_call deltas)
+            start = time.perf_counter()
+            ttft = None
+            chunks = []
+            stream = await acompletion(
+                model=LITELLM_MODEL,
+                messages=messages,
+                tools=tools,
+                tool_choice="auto",
+                stream=True,
+                client=ASYNC_HTTP_HANDLER
+            )
+            async for chunk in stream:
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                chunks.append(chunk)
+            return litellm.stream_chunk_builder(chunks, messages=messages), ttft
+
     try:
-        for i, test_input in enumerate(test_cases, 1):
-            print(f"\nTest Case {i}:")
-            print(f"Input: {test_input[:80]}...")
-
-            messages = [
-                {
-                    "role": "system",
-                    "content": "You are a note organization assistant. Analyze the given text and organize it appropriately using the provided tool."
-                },
-                {
-                    "role": "user",
-                    "content": f"Please organize this note: {test_input}"
-                }
-            ]
-
-            try:
-                # Use async completion with tool calling
-                response = await acompletion(
-                    model="ollama_chat/qwen3:4b-instruct",
-                    messages=messages,
-                    tools=tools,
-                    tool_choice="auto"
-                )
-
-                # Check for tool calls in response
-                if response.choices[0].message.tool_calls:
-                    print("✅ Tool call received!")
-                    for tool_call in response.choices[0].message.tool_calls:
-                        print(f"  Function: {tool_call.function.name}")
-                        args = json.loads(tool_call.function.arguments)
-                        print(f"  Arguments:")
-                        print(f"    Title: {args.get('title')}")
-                        print(f"    Folder: {args.get('folder')}")
-                        print(f"    Tags: {args.get('tags')}")
-                        print(f"    First sentence: {args.get('first_sentence')[:50]}...")
-                else:
-                    print("⚠️  No tool calls in response")
-                    print(f"Response: {response.choices[0].message.content[:200]}...")
-
-            except Exception as e:
-                print(f"❌ Error: {e}")
+        # Test cases are independent - send them concurrently
+        semaphore = asyncio.Semaphore(OLLAMA_NUM_PARALLEL)
+        responses = await asyncio.gather(
+            *(run_case(test_input) for test_input in test_cases),
+            return_exceptions=True
+        )
 
+        parsed_cases = 0
+        with buffered_stdout():
+            for i, (test_input, response) in enumerate(zip(test_cases, responses), 1):
+                print(f"\nTest Case {i}:")
+                print(f"Input: {test_input[:80]}...")
+
+                try:
+                    if isinstance(response, Exception):
+                        raise response
+                    response, ttft = response
+                    if ttft is not None:
+                        print(f"TTFT: {ttft:.2f}s")
+
+                    # Check for tool calls in response
+                    message = response.choices[0].message
+                    if message.tool_calls:
+                        print("✅ Tool call received!")
+                        for tool_call in message.tool_calls:
+                            function = tool_call.function
+                            print(f"  Function: {function.name}")
+                            args = json.loads(function.arguments)
+                            print(f"  Arguments:")
+                            print(f"    Title: {args.get('title')}")
+                            print(f"    Folder: {args.get('folder')}")
+                            print(f"    Tags: {args.get('tags')}")
+                            print(f"    First sentence: {args.get('first_sentence')[:50]}...")
+                        parsed_cases += 1
+                    else:
+                        print("⚠️  No tool calls in response")
+                        print(f"Response: {message.content[:200]}...")
+
+                except Exception as e:
+                    print(f"❌ Error: {e}")
+
+            print(f"\nTool-call arguments parsed: {parsed_cases}/{len(test_cases)} cases")
         agentops.end_session(session)
 
     except Exception as e:
@@ -127,12 +231,12 @@ async def test_async_tool_calling():
 def test_sync_tool_calling():
     """Test synchronous tool calling with LiteLLM + Ollama"""
     print("\n" + "="*60)
-    print("Testing Sync Tool Calling: LiteLLM + Ollama + qwen3:4b-instruct")
+    print(f"Testing Sync Tool Calling: LiteLLM + Ollama + {OLLAMA_MODEL_NAME}")
     print("="*60 + "\n")
 
     session = agentops.start_session(tags={
         "test": "litellm_ollama_sync",
-        "model": "qwen3:4b-instruct"
+        "model": OLLAMA_MODEL_NAME
     })
 
     try:
@@ -140,10 +244,7 @@ def test_sync_tool_calling():
         print(f"Input: {test_input[:80]}...")
 
         messages = [
-            {
-                "role": "system",
-                "content": "You are a note organization assistant. Use the organize_note tool to organize the given text."
-            },
+            SYNC_SYSTEM_MESSAGE,
             {
                 "role": "user",
                 "content": f"Please organize this note: {test_input}"
@@ -152,10 +253,11 @@ def test_sync_tool_calling():
 
         # Use sync completion
         response = completion(
-            model="ollama_chat/qwen3:4b-instruct",
+            model=LITELLM_MODEL,
             messages=messages,
             tools=tools,
-            tool_choice="auto"
+            tool_choice="auto",
+            client=HTTP_HANDLER
         )
 
         # Check for tool calls in response
@@ -196,7 +298,7 @@ async def test_with_openai_agent_sdk_format():
     # Show how to use with Agent SDK
     print("\nFor Agent SDK integration:")
     print("  1. Use litellm.acompletion in custom agent handlers")
-    print("  2. Or run: litellm --model ollama_chat/qwen3:4b-instruct --port 8000")
+    print(f"  2. Or run: litellm --model {LITELLM_MODEL} --port 8000")
     print("     Then point OpenAI client to http://localhost:8000")
 
 async def main():
@@ -205,11 +307,17 @@ async def main():
     print("LiteLLM + Ollama + AgentOps Integration Test")
     print("="*60)
 
-    # Test sync version
-    test_sync_tool_calling()
-
-    # Test async version
-    await test_async_tool_calling()
+    # Sync and async tests are independent - run the sync one in a worker
+    # thread (to_thread copies the context, so its buffer stays thread-local)
+    real_stdout = sys.stdout
+    sys.stdout = _ContextStdout(real_stdout)
+    try:
+        await asyncio.gather(
+            asyncio.to_thread(run_captured, test_sync_tool_calling),
+            test_async_tool_calling()
+        )
+    finally:
+        sys.stdout = real_stdout
 
     # Test OpenAI SDK compatibility
     await test_with_openai_agent_sdk_format()
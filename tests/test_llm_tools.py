@@ -2,11 +2,27 @@
 """
 Test script to evaluate Qwen-3-4B's function calling capabilities with Ollama.
 This tests if the model can extract structured note metadata reliably.
+
+Test cases are sent concurrently; start Ollama with OLLAMA_NUM_PARALLEL=5 (one
+slot per test case) so the server actually decodes them in parallel.
 """
 
+import asyncio
 import json
+import sys
 import ollama
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+from _llm_cache import bypass_cache, cached_chat
+from _tool_helpers import json_dumps, json_loads
+
+# One client (and HTTP connection pool) for every request in the run; keep the
+# model loaded between test cases and sweeps instead of letting it unload
+CLIENT = ollama.AsyncClient()
+OLLAMA_KEEP_ALIVE = '30m'
+# Same context size on every request - a different num_ctx makes Ollama reload
+# the model (and drop its prompt cache); 2048 comfortably fits these prompts
+OLLAMA_NUM_CTX = 2048
 
 # Define our note organization tool
 NOTE_ORGANIZER_TOOL = {
@@ -41,6 +57,13 @@ NOTE_ORGANIZER_TOOL = {
     },
 }
 
+TOOLS = [NOTE_ORGANIZER_TOOL]
+
+TOOL_SYSTEM_MESSAGE = {
+    'role': 'system',
+    'content': 'You are a note organization assistant. Analyze the given text and organize it appropriately.'
+}
+
 # Test cases with expected outputs
 TEST_CASES = [
     {
@@ -80,7 +103,110 @@ TEST_CASES = [
     },
 ]
 
-def test_tool_calling(model_name: str = 'qwen3:4b-instruct') -> Dict[str, Any]:
+# Expected answers per case (indexed by case number - 1), precomputed for scoring
+_EXPECTED_FOLDERS = [tc['expected']['folder'] for tc in TEST_CASES]
+_EXPECTED_TAG_SETS = [frozenset(tc['expected']['tags_should_include']) for tc in TEST_CASES]
+
+def _normalize_tool_call(tool_call) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """(name, parsed arguments) for a tool call given as an object or a dict"""
+    func = tool_call.get('function') if isinstance(tool_call, dict) else getattr(tool_call, 'function', None)
+    if func is None:
+        return None
+    if isinstance(func, dict):
+        name, args = func.get('name'), func.get('arguments', {})
+    else:
+        name, args = func.name, func.arguments
+    if isinstance(args, str):
+        args = json_loads(args)
+    return name, args
+
+def _score_tool_response(response, i: int, results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Print and score one tool-calling response"""
+    try:
+        # Check if tool_calls exist
+        message = response.get('message', {})
+
+        # Handle both dict and object responses
+        if hasattr(message, 'tool_calls'):
+            tool_calls = message.tool_calls
+        else:
+            tool_calls = message.get('tool_calls')
+
+        if tool_calls:
+            results['supports_tools'] = True
+
+            call = _normalize_tool_call(tool_calls[0])
+            if call is None:
+                return None
+            name, args = call
+
+            print(f"✅ Tool call received")
+            print(f"  Function: {name}")
+            print(f"  Arguments: {json_dumps(args, pretty=True)}")
+
+            # Check against expected
+            folder_match = args.get('folder') == _EXPECTED_FOLDERS[i - 1]
+            tags_match = bool(_EXPECTED_TAG_SETS[i - 1].intersection(args.get('tags', ())))
+
+            print(f"  Folder: {args.get('folder')} {'✓' if folder_match else '✗'}")
+            print(f"  Tags: {args.get('tags')} {'✓' if tags_match else '✗'}")
+            return {
+                'success': folder_match and tags_match,
+                'folder_correct': folder_match,
+                'tags_correct': tags_match,
+                'extracted': args
+            }
+        else:
+            print("⚠️  No tool_calls in response")
+            # Try to print just the content
+            if hasattr(message, 'content'):
+                print(f"Response content: {message.content[:200]}...")
+            else:
+                print(f"Response type: {type(message)}")
+            return {'success': False, 'error': 'No tool calls'}
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return {'success': False, 'error': str(e)}
+
+async def _run_tool_case(client: ollama.AsyncClient, model_name: str, i: int,
+                         test_case: Dict[str, Any], results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Run and score one tool-calling test case.
+
+    Only the chat call awaits; the report below it prints as one block even
+    though the cases run concurrently.
+    """
+    try:
+        response = await cached_chat(
+            client,
+            model=model_name,
+            messages=[
+                TOOL_SYSTEM_MESSAGE,
+                {
+                    'role': 'user',
+                    'content': f"Please organize this note: {test_case['input']}"
+                }
+            ],
+            tools=TOOLS,
+            options={'num_ctx': OLLAMA_NUM_CTX},
+            keep_alive=OLLAMA_KEEP_ALIVE
+        )
+        error = None
+    except Exception as e:
+        error = e
+
+    print(f"Test Case {i}:")
+    print(f"Input: {test_case['input'][:80]}...")
+    if error is not None:
+        print(f"❌ Error: {error}")
+        result = {'success': False, 'error': str(error)}
+    else:
+        result = _score_tool_response(response, i, results)
+    print()
+    return result
+
+async def test_tool_calling(model_name: str = 'qwen3:4b-instruct',
+                            client: Optional[ollama.AsyncClient] = None) -> Dict[str, Any]:
     """Test if the model supports tool calling."""
     print(f"\n{'='*60}")
     print(f"Testing tool calling with model: {model_name}")
@@ -93,104 +219,16 @@ def test_tool_calling(model_name: str = 'qwen3:4b-instruct') -> Dict[str, Any]:
         'summary': {}
     }
 
-    for i, test_case in enumerate(TEST_CASES, 1):
-        print(f"Test Case {i}:")
-        print(f"Input: {test_case['input'][:80]}...")
-
-        try:
-            # Try with tool calling
-            response = ollama.chat(
-                model=model_name,
-                messages=[
-                    {
-                        'role': 'system',
-                        'content': 'You are a note organization assistant. Analyze the given text and organize it appropriately.'
-                    },
-                    {
-                        'role': 'user',
-                        'content': f"Please organize this note: {test_case['input']}"
-                    }
-                ],
-                tools=[NOTE_ORGANIZER_TOOL]
-            )
-
-            # Check if tool_calls exist
-            message = response.get('message', {})
-
-            # Handle both dict and object responses
-            if hasattr(message, 'tool_calls'):
-                tool_calls = message.tool_calls
-            else:
-                tool_calls = message.get('tool_calls')
-
-            if tool_calls:
-                results['supports_tools'] = True
-
-                # Convert tool_calls to serializable format if needed
-                if hasattr(tool_calls[0], '__dict__'):
-                    # It's an object, extract the attributes
-                    tool_call = tool_calls[0]
-                    if hasattr(tool_call, 'function'):
-                        func = tool_call.function
-                        args = func.arguments if hasattr(func, 'arguments') else func.get('arguments', {})
-                        if isinstance(args, str):
-                            args = json.loads(args)
-
-                        print(f"✅ Tool call received")
-                        print(f"  Function: {func.name if hasattr(func, 'name') else func.get('name')}")
-                        print(f"  Arguments: {json.dumps(args, indent=2)}")
-
-                        # Check against expected
-                        folder_match = args.get('folder') == test_case['expected']['folder']
-                        tags = args.get('tags', [])
-                        tags_match = any(tag in tags for tag in test_case['expected']['tags_should_include'])
-
-                        result = {
-                            'success': folder_match and tags_match,
-                            'folder_correct': folder_match,
-                            'tags_correct': tags_match,
-                            'extracted': args
-                        }
-                        results['test_results'].append(result)
-                        print(f"  Folder: {args.get('folder')} {'✓' if folder_match else '✗'}")
-                        print(f"  Tags: {args.get('tags')} {'✓' if tags_match else '✗'}")
-                else:
-                    # It's already a dict
-                    print(f"✅ Tool calls received: {json.dumps(tool_calls, indent=2)}")
-                    call = tool_calls[0]
-                    if 'function' in call:
-                        args = call['function'].get('arguments', {})
-                        if isinstance(args, str):
-                            args = json.loads(args)
-
-                        # Check against expected
-                        folder_match = args.get('folder') == test_case['expected']['folder']
-                        tags = args.get('tags', [])
-                        tags_match = any(tag in tags for tag in test_case['expected']['tags_should_include'])
-
-                        result = {
-                            'success': folder_match and tags_match,
-                            'folder_correct': folder_match,
-                            'tags_correct': tags_match,
-                            'extracted': args
-                        }
-                        results['test_results'].append(result)
-                        print(f"  Folder: {args.get('folder')} {'✓' if folder_match else '✗'}")
-                        print(f"  Tags: {args.get('tags')} {'✓' if tags_match else '✗'}")
-            else:
-                print("⚠️  No tool_calls in response")
-                # Try to print just the content
-                if hasattr(message, 'content'):
-                    print(f"Response content: {message.content[:200]}...")
-                else:
-                    print(f"Response type: {type(message)}")
-                results['test_results'].append({'success': False, 'error': 'No tool calls'})
-
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            results['test_results'].append({'success': False, 'error': str(e)})
-
-        print()
+    # Test cases are independent - send them all at once
+    client = client or CLIENT
+    case_results = await asyncio.gather(*[
+        _run_tool_case(client, model_name, i, test_case, results)
+        for i, test_case in enumerate(TEST_CASES, 1)
+    ])
+    results['test_results'] = [r for r in case_results if r is not None]
+    results['failed_cases'] = [
+        i for i, r in enumerate(case_results, 1) if not (r and r.get('success', False))
+    ]
 
     # Calculate summary
     if results['test_results']:
@@ -203,8 +241,81 @@ def test_tool_calling(model_name: str = 'qwen3:4b-instruct') -> Dict[str, Any]:
 
     return results
 
-def test_json_extraction(model_name: str = 'qwen3:4b-instruct') -> Dict[str, Any]:
-    """Fallback test: Can the model output structured JSON without tools?"""
+JSON_SYSTEM_PROMPT = """You are a note organizer. Output ONLY valid JSON with this exact structure:
+{"title":"...","folder":"inbox|projects|people|research|journal","tags":["..."],"first_sentence":"..."}
+- Title: max 10 words
+- Folder: choose the most appropriate
+- Tags: 3-6 relevant tags, lowercase with underscores
+- First_sentence: extract the main point
+NO other text, ONLY the JSON object."""
+
+def _score_json_response(content: str, i: int) -> Dict[str, Any]:
+    """Print and score one JSON-extraction response"""
+    print(f"Raw response: {content[:200]}...")
+
+    # Output is schema-constrained, so the whole response is the JSON object
+    try:
+        data = json_loads(content)
+
+        # Validate
+        folder_match = data.get('folder') == _EXPECTED_FOLDERS[i - 1]
+        tags_match = bool(_EXPECTED_TAG_SETS[i - 1].intersection(data.get('tags', ())))
+
+        print(f"✅ JSON parsed successfully")
+        print(f"  Title: {data.get('title')}")
+        print(f"  Folder: {data.get('folder')} {'✓' if folder_match else '✗'}")
+        print(f"  Tags: {data.get('tags')} {'✓' if tags_match else '✗'}")
+        # Same bar as the tool-calling path: parsing alone isn't a correct answer
+        return {
+            'success': folder_match and tags_match,
+            'parsed': True,
+            'folder_correct': folder_match,
+            'tags_correct': tags_match,
+            'extracted': data
+        }
+
+    except json.JSONDecodeError as e:
+        print(f"❌ JSON parse error: {e}")
+        return {'success': False, 'error': f'JSON parse error: {e}'}
+
+async def _run_json_case(client: ollama.AsyncClient, model_name: str, i: int,
+                         test_case: Dict[str, Any]) -> Dict[str, Any]:
+    """Run and score one JSON-extraction test case (report prints as one block)"""
+    try:
+        response = await cached_chat(
+            client,
+            model=model_name,
+            messages=[
+                {'role': 'system', 'content': JSON_SYSTEM_PROMPT},
+                {'role': 'user', 'content': test_case['input']}
+            ],
+            # Constrain decoding to the note schema - the model can only emit valid JSON
+            format=NOTE_ORGANIZER_TOOL['function']['parameters'],
+            options={'temperature': 0.1, 'num_ctx': OLLAMA_NUM_CTX},  # Lower temperature for consistency
+            keep_alive=OLLAMA_KEEP_ALIVE
+        )
+        error = None
+    except Exception as e:
+        error = e
+
+    print(f"Test Case {i}:")
+    print(f"Input: {test_case['input'][:80]}...")
+    if error is not None:
+        print(f"❌ Error: {error}")
+        result = {'success': False, 'error': str(error)}
+    else:
+        result = _score_json_response(response['message']['content'].strip(), i)
+    print()
+    return result
+
+async def test_json_extraction(model_name: str = 'qwen3:4b-instruct',
+                               client: Optional[ollama.AsyncClient] = None,
+                               case_numbers: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Fallback test: Can the model output structured JSON without tools?
+
+    case_numbers limits the sweep to those (1-based) TEST_CASES, e.g. the ones
+    tool calling failed.
+    """
     print(f"\n{'='*60}")
     print(f"Testing JSON extraction (fallback) with model: {model_name}")
     print(f"{'='*60}\n")
@@ -215,91 +326,63 @@ def test_json_extraction(model_name: str = 'qwen3:4b-instruct') -> Dict[str, Any
         'summary': {}
     }
 
-    system_prompt = """You are a note organizer. Output ONLY valid JSON with this exact structure:
-{"title":"...","folder":"inbox|projects|people|research|journal","tags":["..."],"first_sentence":"..."}
-- Title: max 10 words
-- Folder: choose the most appropriate
-- Tags: 3-6 relevant tags, lowercase with underscores
-- First_sentence: extract the main point
-NO other text, ONLY the JSON object."""
-
-    for i, test_case in enumerate(TEST_CASES, 1):
-        print(f"Test Case {i}:")
-        print(f"Input: {test_case['input'][:80]}...")
+    if case_numbers is None:
+        case_numbers = list(range(1, len(TEST_CASES) + 1))
 
-        try:
-            response = ollama.chat(
-                model=model_name,
-                messages=[
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': test_case['input']}
-                ],
-                options={'temperature': 0.1}  # Lower temperature for consistency
-            )
-
-            content = response['message']['content'].strip()
-            print(f"Raw response: {content[:200]}...")
-
-            # Try to parse JSON
-            try:
-                # Find JSON in response
-                start = content.find('{')
-                end = content.rfind('}')
-                if start >= 0 and end > start:
-                    json_str = content[start:end+1]
-                    data = json.loads(json_str)
-
-                    # Validate
-                    folder_match = data.get('folder') == test_case['expected']['folder']
-                    tags = data.get('tags', [])
-                    tags_match = any(tag in tags for tag in test_case['expected']['tags_should_include'])
-
-                    result = {
-                        'success': True,
-                        'folder_correct': folder_match,
-                        'tags_correct': tags_match,
-                        'extracted': data
-                    }
-                    results['test_results'].append(result)
-
-                    print(f"✅ JSON parsed successfully")
-                    print(f"  Title: {data.get('title')}")
-                    print(f"  Folder: {data.get('folder')} {'✓' if folder_match else '✗'}")
-                    print(f"  Tags: {data.get('tags')} {'✓' if tags_match else '✗'}")
-                else:
-                    print("❌ No JSON found in response")
-                    results['test_results'].append({'success': False, 'error': 'No JSON found'})
-
-            except json.JSONDecodeError as e:
-                print(f"❌ JSON parse error: {e}")
-                results['test_results'].append({'success': False, 'error': f'JSON parse error: {e}'})
-
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            results['test_results'].append({'success': False, 'error': str(e)})
-
-        print()
+    # Test cases are independent - send them all at once
+    client = client or CLIENT
+    results['test_results'] = list(await asyncio.gather(*[
+        _run_json_case(client, model_name, i, TEST_CASES[i - 1])
+        for i in case_numbers
+    ]))
 
     # Calculate summary
     if results['test_results']:
         successful = sum(1 for r in results['test_results'] if r.get('success', False))
         results['summary'] = {
-            'total_tests': len(TEST_CASES),
+            'total_tests': len(case_numbers),
             'successful': successful,
-            'success_rate': f"{(successful/len(TEST_CASES))*100:.1f}%"
+            'success_rate': f"{(successful/len(case_numbers))*100:.1f}%"
         }
 
     return results
 
-def main():
+METHOD_LABELS = {
+    'tool_calling': 'Tool Calling',
+    'json_fallback': 'Tool Calling + JSON Extraction on tool-calling failures',
+}
+
+def _with_json_fallback(tool_results: Dict[str, Any], json_results: Dict[str, Any]) -> Dict[str, Any]:
+    """Score tool calling with JSON extraction retried on its failed cases
+
+    The JSON sweep only runs on tool calling's failures, so its own rate isn't
+    comparable to tool calling's; this combined rate covers every case. A case
+    counts only when folder and tags are both right, whichever method answered.
+    """
+    successful = sum(
+        1 for r in tool_results['test_results'] + json_results['test_results']
+        if r.get('folder_correct') and r.get('tags_correct')
+    )
+    return {
+        'model': tool_results['model'],
+        'summary': {
+            'total_tests': len(TEST_CASES),
+            'successful': successful,
+            'success_rate': f"{(successful/len(TEST_CASES))*100:.1f}%"
+        }
+    }
+
+async def main():
     """Run all tests and provide recommendations."""
     print("\n" + "="*60)
     print("QuickNote AI - LLM Capability Test")
     print("="*60)
 
+    client = CLIENT
+
     # List available models
     try:
-        models = ollama.list()
+        models = await client.list()
         print("\nAvailable models:")
         for model in models['models']:
             print(f"  - {model['name']} ({model['size'] / 1e9:.1f}GB)")
@@ -315,16 +398,28 @@ def main():
 
     for model in test_models:
         try:
-            # Check if model exists
-            ollama.show(model)
+            # Load the model with a 1-token request (raises if it isn't installed).
+            # Same system prompt + tool schema as the tool-calling cases, so
+            # that shared prefix is already in the server's prompt cache.
+            await client.chat(
+                model=model,
+                messages=[TOOL_SYSTEM_MESSAGE, {'role': 'user', 'content': 'ok'}],
+                tools=TOOLS,
+                options={'num_predict': 1, 'num_ctx': OLLAMA_NUM_CTX},
+                keep_alive=OLLAMA_KEEP_ALIVE
+            )
 
             # Test tool calling
-            tool_results = test_tool_calling(model)
+            tool_results = await test_tool_calling(model, client)
             all_results.append(('tool_calling', tool_results))
 
-            # Test JSON extraction as fallback
-            json_results = test_json_extraction(model)
-            all_results.append(('json_extraction', json_results))
+            # Test JSON extraction as fallback - only for the cases tool calling
+            # got wrong (skipped entirely when it passed everything)
+            if tool_results['failed_cases']:
+                json_results = await test_json_extraction(model, client, tool_results['failed_cases'])
+                all_results.append(('json_fallback', _with_json_fallback(tool_results, json_results)))
+            else:
+                print("\n✅ Tool calling passed every case - skipping JSON extraction fallback")
 
         except ollama.ResponseError as e:
             if 'not found' in str(e).lower():
@@ -342,21 +437,25 @@ def main():
     best_model = None
     best_score = 0
 
+    # Both configurations are scored over the full TEST_CASES set, on the same
+    # folder-and-tags-correct bar
     for method, results in all_results:
-        if results.get('summary', {}).get('successful', 0) > best_score:
-            best_score = results['summary']['successful']
+        summary = results.get('summary', {})
+        score = summary.get('successful', 0) / summary['total_tests'] if summary else 0
+        if score > best_score:
+            best_score = score
             best_method = method
             best_model = results['model']
 
     if best_score > 0:
         print(f"\n✅ Best configuration:")
         print(f"   Model: {best_model}")
-        print(f"   Method: {'Tool Calling' if best_method == 'tool_calling' else 'JSON Extraction'}")
-        print(f"   Success rate: {(best_score/len(TEST_CASES))*100:.1f}%")
+        print(f"   Method: {METHOD_LABELS[best_method]}")
+        print(f"   Success rate: {best_score*100:.1f}% (all {len(TEST_CASES)} cases)")
 
-        if best_method == 'json_extraction':
-            print(f"\n📝 Note: This model doesn't support native tool calling.")
-            print(f"   The JSON extraction method will be used as fallback.")
+        if best_method == 'json_fallback':
+            print(f"\n📝 Note: Tool calling alone misses some cases.")
+            print(f"   JSON extraction will be used as fallback when a tool call fails.")
     else:
         print("\n⚠️  No successful configurations found.")
         print("   Consider using a larger model or implementing a more robust fallback.")
@@ -368,4 +467,8 @@ def main():
     print("   4. Using embeddings for folder/tag suggestions")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Responses are cached on disk (tests/.llm_cache.sqlite); --no-cache forces
+    # fresh calls without deleting anything
+    if "--no-cache" in sys.argv[1:]:
+        bypass_cache()
+    asyncio.run(main())
\ No newline at end of file
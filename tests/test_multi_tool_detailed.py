@@ -1,15 +1,28 @@
 #!/usr/bin/env python3
 """
 Test script to see detailed AI outputs for multi-tool queries
+
+Every (query, model) run is dispatched concurrently. Start Ollama with
+
+    OLLAMA_NUM_PARALLEL=4 OLLAMA_MAX_LOADED_MODELS=2 ollama serve
+
+so both models stay resident and each one batches its concurrent requests.
+Requests for different models can't share a batch - across models the win
+is concurrency, within a model it is batching.
 """
 
 import asyncio
-import sys
-import os
 
-# Import from the main test file
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from test_litellm_agentic_loop import run_multi_tool, is_multi_tool_query
+from test_litellm_agentic_loop import (
+    run_multi_tool, is_multi_tool_query, get_http_client, close_http_client
+)
+from _concurrent_output import buffered_stdout, task_output
+
+async def run_captured(query, model_path):
+    """Run one multi-tool query with its output buffered; returns (result, output)"""
+    with task_output() as buffer:
+        result = await run_multi_tool(query, model_path)
+    return result, buffer.getvalue()
 
 async def test_multi_tool_detailed():
     """Test multi-tool queries with detailed output"""
@@ -26,6 +39,21 @@ async def test_multi_tool_detailed():
         ("ollama/qwen3:4b-instruct", "Qwen 3 (4B)")
     ]
 
+    # Every (query, model) run is independent - overlap all the LLM waits,
+    # then print each run's buffered output in the usual order
+    runs = [
+        (query, model_path)
+        for query in test_queries if is_multi_tool_query(query)
+        for model_path, _ in models
+    ]
+    get_http_client()
+    try:
+        with buffered_stdout():
+            outputs = await asyncio.gather(*(run_captured(query, model_path) for query, model_path in runs))
+    finally:
+        await close_http_client()
+    results = dict(zip(runs, outputs))
+
     for query in test_queries:
         print("\n" + "="*80)
         print(f"TEST QUERY: {query}")
@@ -41,7 +69,8 @@ async def test_multi_tool_detailed():
             print(f"Detected as multi-tool query: {is_multi}")
 
             if is_multi:
-                result = await run_multi_tool(query, model_path)
+                result, output = results[(query, model_path)]
+                print(output, end="")
                 print(f"\n🏁 FINAL RESULT: {result}")
             else:
                 print("Not detected as multi-tool, skipping...")
@@ -51,4 +80,4 @@ async def test_multi_tool_detailed():
 if __name__ == "__main__":
     print("DETAILED MULTI-TOOL QUERY TESTING")
     print("="*80)
-    asyncio.run(test_multi_tool_detailed())
\ No newline at end of file
+    asyncio.run(test_multi_tool_detailed())
@@ -1,12 +1,28 @@
-from ollama import chat
+import sys
+
+from ollama import Client
 from ollama import ChatResponse
 
+# Reused client (one HTTP connection pool); keep the model loaded afterwards
+client = Client()
 
-stream = chat(
+stream = client.chat(
     model='qwen3:4b-instruct',
     messages=[{'role': 'user', 'content': 'Why is the sky blue?'}],
     stream=True,
+    keep_alive='10m',
 )
 
-for chunk in stream:
-  print(chunk['message']['content'], end='', flush=True)
\ No newline at end of file
+# Write streamed tokens in batches of FLUSH_EVERY chunks instead of one flush per chunk
+FLUSH_EVERY = 16
+
+buf = []
+for n, chunk in enumerate(stream, 1):
+  buf.append(chunk['message']['content'])
+  if n % FLUSH_EVERY == 0:
+    sys.stdout.write(''.join(buf))
+    sys.stdout.flush()
+    buf.clear()
+
+sys.stdout.write(''.join(buf))
+sys.stdout.flush()
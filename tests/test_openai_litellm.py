@@ -6,12 +6,19 @@ This confirms the integration works properly with a model that supports tool cal
 
 import asyncio
 import os
-from datetime import datetime
+from datetime import datetime, timezone
+from types import MappingProxyType
 from typing import Dict
 import agentops
+import httpx
+import litellm
 from agents import Agent, Runner, function_tool, ModelSettings
 from agents.extensions.models.litellm_model import LitellmModel
+from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
 from dotenv import load_dotenv
+from _concurrent_output import run_tests_concurrently
+from _tool_helpers import evaluate_expression
+from _agentops_sessions import drain_session_ends, end_session_in_background, end_test_session
 
 # Load environment variables
 load_dotenv()
@@ -33,6 +40,30 @@ if not openai_api_key:
 else:
     print("✅ OpenAI API key loaded")
 
+# Shared keep-alive HTTP client so every LiteLLM call reuses pooled connections
+# (and TLS sessions to OpenAI) across tests. The OpenAI route reads it from
+# litellm.aclient_session; the ollama provider ignores that, so the Ollama
+# agents pass it as client= through OLLAMA_SETTINGS.
+HTTP_CLIENT = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_keepalive_connections=32,
+        max_connections=64,
+        keepalive_expiry=30.0
+    ),
+    timeout=httpx.Timeout(60.0, connect=5.0)
+)
+litellm.aclient_session = HTTP_CLIENT
+OLLAMA_HTTP_HANDLER = AsyncHTTPHandler()
+OLLAMA_HTTP_HANDLER.client = HTTP_CLIENT
+OLLAMA_SETTINGS = ModelSettings(extra_args={"client": OLLAMA_HTTP_HANDLER})
+
+# One model object per backend, shared by every agent in this file. Both local
+# models name the same Ollama base URL, so their calls share pooled connections.
+OLLAMA_BASE_URL = "http://localhost:11434"
+GPT5_MODEL = LitellmModel(model="gpt-5", api_key=openai_api_key)
+GEMMA_MODEL = LitellmModel(model="ollama/gemma3:4b", base_url=OLLAMA_BASE_URL, api_key="dummy")
+QWEN_MODEL = LitellmModel(model="ollama/qwen3:4b-instruct", base_url=OLLAMA_BASE_URL, api_key="dummy")
+
 # ============================================================================
 # TOOL DEFINITIONS
 # ============================================================================
@@ -49,7 +80,7 @@ def calculate(expression: str) -> Dict:
         Dictionary with calculation result
     """
     try:
-        result = eval(expression, {"__builtins__": {}})
+        result = evaluate_expression(expression)
         return {
             "expression": expression,
             "result": result,
@@ -69,8 +100,7 @@ def get_current_time(timezone_name: str = "UTC") -> Dict:
     Returns:
         Dictionary with current time information
     """
-    from datetime import timezone as tz
-    now = datetime.now(tz.utc)
+    now = datetime.now(timezone.utc)
     return {
         "date": now.strftime("%Y-%m-%d"),
         "time": now.strftime("%H:%M:%S"),
@@ -79,6 +109,15 @@ def get_current_time(timezone_name: str = "UTC") -> Dict:
         "day_of_week": now.strftime("%A")
     }
 
+# Mock weather data keyed by lowercased city (read-only, shared by all calls)
+WEATHER_DATA = MappingProxyType({
+    "london": MappingProxyType({"temp": "15°C", "condition": "Cloudy", "humidity": "70%"}),
+    "tokyo": MappingProxyType({"temp": "22°C", "condition": "Sunny", "humidity": "55%"}),
+    "new york": MappingProxyType({"temp": "18°C", "condition": "Partly cloudy", "humidity": "60%"}),
+    "paris": MappingProxyType({"temp": "17°C", "condition": "Rainy", "humidity": "80%"}),
+})
+DEFAULT_WEATHER = MappingProxyType({"temp": "20°C", "condition": "Clear", "humidity": "50%"})
+
 @function_tool
 def get_weather(city: str) -> Dict:
     """
@@ -90,15 +129,7 @@ def get_weather(city: str) -> Dict:
     Returns:
         Dictionary with weather information
     """
-    # Mock weather data
-    weather_data = {
-        "London": {"temp": "15°C", "condition": "Cloudy", "humidity": "70%"},
-        "Tokyo": {"temp": "22°C", "condition": "Sunny", "humidity": "55%"},
-        "New York": {"temp": "18°C", "condition": "Partly cloudy", "humidity": "60%"},
-        "Paris": {"temp": "17°C", "condition": "Rainy", "humidity": "80%"},
-    }
-
-    data = weather_data.get(city, {"temp": "20°C", "condition": "Clear", "humidity": "50%"})
+    data = WEATHER_DATA.get(city.strip().lower(), DEFAULT_WEATHER)
     return {
         "city": city,
         "temperature": data["temp"],
@@ -117,18 +148,12 @@ async def test_gpt5_single_tool():
     print("TEST 1: GPT-5 Single Tool Calls")
     print("="*60)
 
-    # Create LiteLLM model for GPT-5
-    litellm_model = LitellmModel(
-        model="gpt-5",  # Using GPT-5
-        api_key=openai_api_key
-    )
-
     # Create agent
     agent = Agent(
         name="Assistant",
         instructions="""You are a helpful AI assistant with access to various tools.
         Use the appropriate tools to answer user questions accurately.""",
-        model=litellm_model,
+        model=GPT5_MODEL,
         tools=[get_current_time, calculate, get_weather],
         model_settings=ModelSettings(include_usage=True)
     )
@@ -139,30 +164,38 @@ async def test_gpt5_single_tool():
         "What's the weather in Tokyo?"
     ]
 
-    for query in test_queries:
-        print(f"\nQuery: {query}")
-        print("-" * 40)
-
-        session = agentops.start_session(tags={
-            "test": "gpt5_single_tool",
-            "model": "gpt-5"
-        })
+    # One AgentOps session covers every query in this test
+    session = agentops.start_session(tags={
+        "test": "gpt5_single_tool",
+        "model": "gpt-5"
+    })
 
-        try:
-            result = await Runner.run(
+    # Queries are independent - dispatch them concurrently, then print in order
+    results = []
+    try:
+        results = await asyncio.gather(*(
+            Runner.run(
                 starting_agent=agent,
                 input=query,
                 max_turns=5  # Should only need 2-3 turns
             )
-            print(f"✅ Response: {result.final_output}")
+            for query in test_queries
+        ), return_exceptions=True)
+    finally:
+        end_test_session(session, results)
 
-            if hasattr(result, 'usage'):
-                print(f"Usage: {result.usage}")
+    for query, result in zip(test_queries, results):
+        print(f"\nQuery: {query}")
+        print("-" * 40)
+
+        if isinstance(result, Exception):
+            print(f"❌ Error: {result}")
+            continue
 
-            agentops.end_session(session)
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            agentops.end_session(session, error=str(e))
+        print(f"✅ Response: {result.final_output}")
+
+        if hasattr(result, 'usage'):
+            print(f"Usage: {result.usage}")
 
 async def test_gpt5_multi_tool():
     """Test GPT-5 with multiple tools in one query"""
@@ -170,20 +203,15 @@ async def test_gpt5_multi_tool():
     print("TEST 2: GPT-5 Multi-Tool Query")
     print("="*60)
 
-    # Create LiteLLM model for GPT-5
-    litellm_model = LitellmModel(
-        model="gpt-5",
-        api_key=openai_api_key
-    )
-
     # Create agent
     agent = Agent(
         name="Multi-Tool Assistant",
         instructions="""You are a helpful assistant with multiple capabilities.
         When asked complex questions, use multiple tools to provide comprehensive answers.""",
-        model=litellm_model,
+        model=GPT5_MODEL,
         tools=[get_current_time, calculate, get_weather],
-        model_settings=ModelSettings(include_usage=True)
+        # Independent tools are requested in one turn and run concurrently by the SDK
+        model_settings=ModelSettings(parallel_tool_calls=True, include_usage=True)
     )
 
     complex_query = "What's the current time, the weather in London, and what's 15% of 200?"
@@ -207,10 +235,10 @@ async def test_gpt5_multi_tool():
         if hasattr(result, 'usage'):
             print(f"Usage: {result.usage}")
 
-        agentops.end_session(session)
+        end_session_in_background(session)
     except Exception as e:
         print(f"❌ Error: {e}")
-        agentops.end_session(session, error=str(e))
+        end_session_in_background(session, error=str(e))
 
 async def test_comparison_with_ollama_models():
     """Compare GPT-5 with qwen3:4b-instruct and gemma3:4b"""
@@ -220,95 +248,98 @@ async def test_comparison_with_ollama_models():
 
     query = "Calculate 50 + 50"
 
-    # Test with GPT-5
-    print("\n--- Testing with GPT-5 ---")
-    gpt5_model = LitellmModel(
-        model="gpt-5",
-        api_key=openai_api_key
-    )
-
+    # Build all three agents up front (no network involved)
     gpt5_agent = Agent(
         name="GPT-5 Assistant",
         instructions="You are a helpful assistant. Use the calculate tool for math questions.",
-        model=gpt5_model,
+        model=GPT5_MODEL,
         tools=[calculate]
     )
 
-    try:
-        result = await Runner.run(
-            starting_agent=gpt5_agent,
-            input=query,
-            max_turns=5
-        )
-        print(f"✅ GPT-5 succeeded: {result.final_output}")
-    except Exception as e:
-        print(f"❌ GPT-5 failed: {e}")
-
-    # Test with gemma3:4b
-    print("\n--- Testing with gemma3:4b ---")
-    gemma_model = LitellmModel(
-        model="ollama/gemma3:4b",
-        api_key="dummy"
-    )
-
     gemma_agent = Agent(
         name="Gemma Assistant",
         instructions="""You are a helpful assistant. Use the calculate tool for math questions.
 
         IMPORTANT: After receiving the tool result, immediately provide a final answer to the user.
         Format your response in natural language, not raw JSON.""",
-        model=gemma_model,
+        model=GEMMA_MODEL,
+        model_settings=OLLAMA_SETTINGS,
         tools=[calculate]
     )
 
-    try:
-        result = await Runner.run(
-            starting_agent=gemma_agent,
-            input=query,
-            max_turns=5  # Give it more turns since it might need them
-        )
-        print(f"✅ Gemma succeeded: {result.final_output}")
-    except Exception as e:
-        print(f"❌ Gemma failed: {e}")
-
-    # Test with qwen3:4b-instruct
-    print("\n--- Testing with qwen3:4b-instruct ---")
-    qwen_model = LitellmModel(
-        model="ollama/qwen3:4b-instruct",
-        api_key="dummy"
-    )
-
     qwen_agent = Agent(
         name="Qwen Assistant",
         instructions="You are a helpful assistant. Use the calculate tool for math questions.",
-        model=qwen_model,
+        model=QWEN_MODEL,
+        model_settings=OLLAMA_SETTINGS,
         tools=[calculate]
     )
 
-    try:
-        result = await Runner.run(
-            starting_agent=qwen_agent,
-            input=query,
-            max_turns=3
-        )
-        print(f"✅ Qwen succeeded: {result.final_output}")
-    except Exception as e:
-        print(f"❌ Qwen failed: {e}")
+    # (display name, label, agent, max_turns) - gemma gets more turns since it might need them
+    runs = [
+        ("GPT-5", "GPT-5", gpt5_agent, 5),
+        ("gemma3:4b", "Gemma", gemma_agent, 5),
+        ("qwen3:4b-instruct", "Qwen", qwen_agent, 3),
+    ]
+
+    # The runs are independent - GPT-5 goes to OpenAI and Ollama can serve both
+    # local models at once with OLLAMA_MAX_LOADED_MODELS>=2 and OLLAMA_NUM_PARALLEL>=2
+    results = await asyncio.gather(*(
+        Runner.run(starting_agent=agent, input=query, max_turns=max_turns)
+        for _, _, agent, max_turns in runs
+    ), return_exceptions=True)
+
+    for (display_name, label, _, _), result in zip(runs, results):
+        print(f"\n--- Testing with {display_name} ---")
+        if isinstance(result, Exception):
+            print(f"❌ {label} failed: {result}")
+        else:
+            print(f"✅ {label} succeeded: {result.final_output}")
 
 # ============================================================================
 # MAIN
 # ============================================================================
 
+async def warm_up_model(model: str, api_key: str, **completion_kwargs):
+    """Send a 1-token request so the first test doesn't pay the model load / connection setup"""
+    try:
+        await asyncio.wait_for(
+            litellm.acompletion(
+                model=model,
+                api_key=api_key,
+                messages=[{"role": "user", "content": "ping"}],
+                max_tokens=1,
+                **completion_kwargs
+            ),
+            timeout=30
+        )
+        print(f"✅ {model} warmed up")
+    except Exception as e:
+        print(f"⚠️  {model} warmup failed: {e!r}")
+
 async def main():
     """Run all tests"""
     print("\n" + "="*60)
     print("OpenAI GPT-5 + LiteLLM + OpenAI Agents SDK Test")
     print("="*60)
 
-    # Run tests
-    await test_gpt5_single_tool()
-    await test_gpt5_multi_tool()
-    await test_comparison_with_ollama_models()
+    # Load the local models (and open the OpenAI connection) before timing anything
+    await asyncio.gather(
+        warm_up_model("gpt-5", openai_api_key),
+        warm_up_model("ollama/gemma3:4b", "dummy", client=OLLAMA_HTTP_HANDLER),
+        warm_up_model("ollama/qwen3:4b-instruct", "dummy", client=OLLAMA_HTTP_HANDLER),
+    )
+
+    # The three tests are independent - overlap their LLM waits
+    try:
+        await run_tests_concurrently(
+            test_gpt5_single_tool(),
+            test_gpt5_multi_tool(),
+            test_comparison_with_ollama_models(),
+        )
+    finally:
+        await drain_session_ends()
+        await HTTP_CLIENT.aclose()
 
     print("\n" + "="*60)
     print("SUMMARY")
@@ -5,199 +5,322 @@ These tests ensure behavior doesn't change during the refactor
 
 Run before and after refactoring to ensure no regressions:
     pytest tests/test_refactor_regression.py -v
+
+LLM-backed tests are marked `slow`; the fast lane (unit tests only) is:
+    pytest tests/test_refactor_regression.py -m "not slow"
+
+The test classes are independent, so with pytest-xdist they can be spread
+across worker processes, one class per worker (start Ollama with
+OLLAMA_NUM_PARALLEL=$(nproc) to serve them):
+    pytest tests/test_refactor_regression.py -v -n auto --dist loadscope
+
+LLM-backed calls are answered from the recordings in tests/.llm_cache/ (one
+JSON file per model + prompt) when the same prompt was seen before; set
+LLM_CACHE=0 to always hit the model, LLM_CACHE=record to refresh the recordings,
+or LLM_CACHE=replay to run without Ollama. Commit new or changed recordings
+after a record run so replay works on a fresh checkout.
 """
-import pytest
 import asyncio
-
-# Use anyio for async tests
-pytest_plugins = ('pytest_asyncio',)
-import tempfile
-import shutil
+import hashlib
+import json
+import httpx
+import pytest
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import List, Literal, Optional
+from unittest.mock import MagicMock, create_autospec, patch
 from pathlib import Path
 import sys
 import os
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from api.services.capture import classify_note_async
-from api.services.search import search_notes_smart, parse_smart_query
-from api.services.enrichment import enrich_note_metadata
-from api.services.consolidation import find_link_candidates, suggest_links_batch
-from api.llm import get_llm
+# pytest.ini puts the repo root and tests/ on sys.path; a direct script run
+# doesn't read it, so make the repo root importable here
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.legacy.capture import classify_note_async, classify_and_enrich_async
+from api.legacy.search import search_notes_smart, parse_smart_query
+from api.legacy.enrichment import enrich_note_metadata
+from api.legacy.consolidation import find_link_candidates, suggest_links_batch
+from api.legacy.graph import index_note_with_enrichment
+from api.legacy import capture, consolidation, enrichment
+import api.legacy.search as smart_search
+from api.llm import get_llm, warm_up_llm
+from api.config import get_db_connection, get_db_path
+from api.llm.prompts import Prompts
 from api.notes import write_markdown
 from api.fts import search_notes
-from api.db import ensure_db
-from api.config import DB_PATH, NOTES_DIR
+from api.legacy.models import DimensionFlags
+from pydantic import BaseModel, TypeAdapter
+
+from _llm_cache import CACHE_MODE, cached_llm
+
+# Service modules whose get_llm() clients answer through the response cache
+LLM_SERVICE_MODULES = (capture, enrichment, smart_search, consolidation)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def llm_response_cache():
+    """Answer the services' LLM calls from the on-disk response cache"""
+    if CACHE_MODE == "0":
+        yield
+        return
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        for module in LLM_SERVICE_MODULES:
+            monkeypatch.setattr(module, "get_llm", cached_llm(module.get_llm))
+        yield
+
+
+async def _gather_by_key(fn, inputs: dict) -> dict:
+    """Call fn(*args) for every input concurrently; results keyed like inputs"""
+    results = await asyncio.gather(*(fn(*args) for args in inputs.values()))
+    return dict(zip(inputs, results))
+
+
+# Inputs for the LLM-backed tests. Each class's calls are independent, so a
+# module-scoped fixture issues them all at once and the tests assert on the results.
+CLASSIFY_SAMPLES = {
+    "task": ("Fix the login bug in authentication service",),
+    "meeting": ("Met with Sarah to discuss memory consolidation research",),
+    "idea": ("What if we used FAISS for vector search instead of manual linking?",),
+    "journal": ("Feeling overwhelmed today with all the project deadlines",),
+}
+
+ENRICH_SAMPLES = {
+    "person": (
+        "Met with Sarah to discuss psychology research",
+        {
+            "dimensions": {"has_action_items": False, "is_social": True, "is_emotional": False, "is_knowledge": False, "is_exploratory": False},
+            "title": "Meeting with Sarah",
+            "tags": []
+        },
+    ),
+    "topics": (
+        "Researching FAISS vector database for similarity search",
+        {
+            "dimensions": {"has_action_items": False, "is_social": False, "is_emotional": False, "is_knowledge": True, "is_exploratory": False},
+            "title": "FAISS research",
+            "tags": []
+        },
+    ),
+    "emotions": (
+        "I'm really excited about this new vector search approach!",
+        {
+            "dimensions": {"has_action_items": False, "is_social": False, "is_emotional": True, "is_knowledge": False, "is_exploratory": False},
+            "title": "Excited about vector search",
+            "tags": []
+        },
+    ),
+}
+
+SEARCH_QUERIES = {
+    "person": ("what's the recent project I did with Sarah",),
+    "emotion": ("notes where I felt excited about FAISS",),
+    "context": ("meetings about AWS infrastructure",),
+}
+
+# (SEARCH_QUERIES key, accepted values per filter, term expected in entity or text_query)
+PARSE_CASES = [
+    pytest.param("person", {"person": {"Sarah", "sarah"}, "sort": {"recent"}}, None, id="person"),
+    pytest.param("emotion", {"emotion": {"excited", "Excited"}}, "FAISS", id="emotion"),
+    pytest.param("context", {"context": {"meetings"}}, "AWS", id="context"),
+]
 
 
 @pytest.fixture(scope="module")
-def setup_test_env():
-    """Setup test environment with temporary database"""
-    # Backup original DB path
-    original_db = DB_PATH
-    original_notes_dir = NOTES_DIR
+async def warm_llm():
+    """Load the model once before the LLM-backed fixtures fan out their calls"""
+    if CACHE_MODE == "replay":
+        return  # Answers come from the cache; Ollama may not be running
+    try:
+        await warm_up_llm()
+    except Exception as e:
+        print(f"⚠️  LLM warmup failed: {e}")
+
+
+@pytest.fixture(scope="module")
+async def classified_samples(llm_response_cache, warm_llm):
+    """classify_note_async() result for every CLASSIFY_SAMPLES text"""
+    return await _gather_by_key(classify_note_async, CLASSIFY_SAMPLES)
+
+
+@pytest.fixture(scope="module")
+async def enriched_samples(llm_response_cache, warm_llm):
+    """enrich_note_metadata() result for every ENRICH_SAMPLES note"""
+    return await _gather_by_key(enrich_note_metadata, ENRICH_SAMPLES)
+
+
+@pytest.fixture(scope="module")
+async def parsed_queries(llm_response_cache, warm_llm):
+    """parse_smart_query() result for every SEARCH_QUERIES query"""
+    return await _gather_by_key(parse_smart_query, SEARCH_QUERIES)
+
+
+class ClassificationResult(BaseModel):
+    """Shape every classify_note_async() result must have"""
+    title: str
+    dimensions: DimensionFlags
+    tags: List[str]
+    status: Optional[Literal["todo", "in_progress", "done"]]
+    reasoning: str
+    needs_review: bool
+
+
+# Built once and reused for every classification result
+CLASSIFICATION_ADAPTER = TypeAdapter(ClassificationResult)
+
+
+# Recorded classify_note_async() LLM responses for the fast (unit) classification tests
+LLM_FIXTURES_DIR = Path(__file__).parent / "fixtures" / "llm_responses"
+
+
+def _prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode()).hexdigest()
+
+
+class FakeLLM:
+    """Stands in for get_llm(): answers recorded prompts, keyed by prompt hash"""
+
+    def __init__(self, fixture_dir: Path = LLM_FIXTURES_DIR):
+        self.responses = {}
+        for path in sorted(fixture_dir.glob("classify_*.json")):
+            recorded = json.loads(path.read_text())
+            prompt = Prompts.CLASSIFY_NOTE.format(text=recorded["text"])
+            self.responses[_prompt_hash(prompt)] = json.dumps(recorded["response"])
+
+    async def ainvoke(self, prompt: str):
+        return SimpleNamespace(content=self.responses[_prompt_hash(prompt)])
+
+
+@contextmanager
+def _untracked_llm_call(*args, **kwargs):
+    """track_llm_call() without the audit-log write"""
+    yield MagicMock()
+
+
+@pytest.mark.unit
+class TestCaptureRouting:
+    """Test classification post-processing against recorded LLM responses"""
+
+    @pytest.fixture
+    def classify(self, monkeypatch):
+        """classify_note_async() backed by FakeLLM (no model, no response cache, no audit log)"""
+        llm = FakeLLM()
+        monkeypatch.setattr(capture, "get_llm", lambda: llm)
+        monkeypatch.setattr(capture, "track_llm_call", _untracked_llm_call)
+        return capture.classify_note_async
 
-    # Create temp directory
-    temp_dir = tempfile.mkdtemp()
-    test_notes_dir = Path(temp_dir) / "notes"
-    test_notes_dir.mkdir()
+    async def test_task_note_gets_status(self, classify):
+        """Test an actionable note keeps its status"""
+        result = await classify(CLASSIFY_SAMPLES["task"][0])
 
-    # Create .index directory for database
-    test_index_dir = test_notes_dir / ".index"
-    test_index_dir.mkdir(parents=True, exist_ok=True)
+        assert result["dimensions"]["has_action_items"] is True
+        assert result["status"] == "todo"
+        assert len(result["tags"]) > 0
+        assert result["needs_review"] is False
 
-    # Override config paths for testing
-    import api.config as config
-    config.DB_PATH = test_index_dir / "notes.sqlite"
-    config.NOTES_DIR = test_notes_dir
+    @pytest.mark.parametrize("sample", ["meeting", "idea", "journal"])
+    async def test_non_actionable_note_has_no_status(self, classify, sample):
+        """Test notes without action items get status None"""
+        result = await classify(CLASSIFY_SAMPLES[sample][0])
 
-    # Initialize test database
-    ensure_db()
+        assert result["dimensions"]["has_action_items"] is False
+        assert result["status"] is None
+        assert "title" in result
 
-    yield test_notes_dir
+    async def test_llm_failure_falls_back(self, classify):
+        """Test an LLM error yields the flagged fallback classification"""
+        result = await classify("A note with no recorded response")
 
-    # Cleanup
-    shutil.rmtree(temp_dir)
-    config.DB_PATH = original_db
-    config.NOTES_DIR = original_notes_dir
+        assert result["status"] is None
+        assert result["needs_review"] is True
+        assert result["reasoning"].startswith("Classification failed")
 
 
+@pytest.mark.slow
 class TestCaptureFlow:
     """Test note classification and capture"""
 
-    @pytest.mark.asyncio
-    async def test_classify_task_note(self):
+    async def test_classify_task_note(self, classified_samples):
         """Test classifying a task note"""
-        text = "Fix the login bug in authentication service"
-        result = await classify_note_async(text)
+        result = CLASSIFICATION_ADAPTER.validate_python(classified_samples["task"])
 
         # Task should have status (only tasks have status)
-        assert result["status"] in ["todo", "in_progress", "done"]
-        assert len(result["tags"]) > 0
-        assert "title" in result
+        assert result.status is not None
+        assert len(result.tags) > 0
 
-    @pytest.mark.asyncio
-    async def test_classify_meeting_note(self):
+    async def test_classify_meeting_note(self, classified_samples):
         """Test classifying a meeting note"""
-        text = "Met with Sarah to discuss memory consolidation research"
-        result = await classify_note_async(text)
+        result = CLASSIFICATION_ADAPTER.validate_python(classified_samples["meeting"])
 
-        # Meeting notes should not have status
-        assert result["status"] is None
-        # Tags might be empty for some classifications
-        assert "tags" in result
+        # Meeting notes should not have status (tags might be empty)
+        assert result.status is None
 
-    @pytest.mark.asyncio
-    async def test_classify_idea_note(self):
+    async def test_classify_idea_note(self, classified_samples):
         """Test classifying an idea note"""
-        text = "What if we used FAISS for vector search instead of manual linking?"
-        result = await classify_note_async(text)
+        result = CLASSIFICATION_ADAPTER.validate_python(classified_samples["idea"])
 
         # Ideas don't have status
-        assert result["status"] is None
+        assert result.status is None
 
-    @pytest.mark.asyncio
-    async def test_classify_journal_note(self):
+    async def test_classify_journal_note(self, classified_samples):
         """Test classifying a journal note"""
-        text = "Feeling overwhelmed today with all the project deadlines"
-        result = await classify_note_async(text)
+        result = CLASSIFICATION_ADAPTER.validate_python(classified_samples["journal"])
 
         # Journal notes don't have status
-        assert result["status"] is None
+        assert result.status is None
 
 
+@pytest.mark.slow
 class TestEnrichmentFlow:
     """Test metadata enrichment"""
 
-    @pytest.mark.asyncio
-    async def test_enrich_extracts_person(self):
+    async def test_enrich_extracts_person(self, enriched_samples):
         """Test person extraction"""
-        text = "Met with Sarah to discuss psychology research"
-        classification = {
-            "dimensions": {"has_action_items": False, "is_social": True, "is_emotional": False, "is_knowledge": False, "is_exploratory": False},
-            "title": "Meeting with Sarah",
-            "tags": []
-        }
-
-        enrichment = await enrich_note_metadata(text, classification)
+        enrichment = enriched_samples["person"]
 
         assert "people" in enrichment
         people_names = [p["name"] for p in enrichment.get("people", [])]
         assert "Sarah" in people_names or "sarah" in [n.lower() for n in people_names]
 
-    @pytest.mark.asyncio
-    async def test_enrich_extracts_topics(self):
+    async def test_enrich_extracts_topics(self, enriched_samples):
         """Test entity extraction (merged topics/projects/tech)"""
-        text = "Researching FAISS vector database for similarity search"
-        classification = {
-            "dimensions": {"has_action_items": False, "is_social": False, "is_emotional": False, "is_knowledge": True, "is_exploratory": False},
-            "title": "FAISS research",
-            "tags": []
-        }
-
-        enrichment = await enrich_note_metadata(text, classification)
+        enrichment = enriched_samples["topics"]
 
         # LLM extraction varies - just verify structure exists
         assert "entities" in enrichment
         # At least the enrichment ran successfully
         assert "reasoning" in enrichment or "entities" in enrichment
 
-    @pytest.mark.asyncio
-    async def test_enrich_extracts_emotions(self):
+    async def test_enrich_extracts_emotions(self, enriched_samples):
         """Test emotion extraction"""
-        text = "I'm really excited about this new vector search approach!"
-        classification = {
-            "dimensions": {"has_action_items": False, "is_social": False, "is_emotional": True, "is_knowledge": False, "is_exploratory": False},
-            "title": "Excited about vector search",
-            "tags": []
-        }
-
-        enrichment = await enrich_note_metadata(text, classification)
+        enrichment = enriched_samples["emotions"]
 
         assert "emotions" in enrichment
         emotions = [e.lower() for e in enrichment.get("emotions", [])]
         assert "excited" in emotions
 
 
+@pytest.mark.slow
 class TestSearchFlow:
     """Test smart search functionality"""
 
-    @pytest.mark.asyncio
-    async def test_parse_person_query(self):
-        """Test parsing person search query"""
-        query = "what's the recent project I did with Sarah"
-        filters = await parse_smart_query(query)
-
-        assert filters.get("person") == "Sarah" or filters.get("person") == "sarah"
-        assert filters.get("sort") == "recent"
-
-    @pytest.mark.asyncio
-    async def test_parse_emotion_query(self):
-        """Test parsing emotion search query"""
-        query = "notes where I felt excited about FAISS"
-        filters = await parse_smart_query(query)
+    @pytest.mark.parametrize("query_key, expected, mentions", PARSE_CASES)
+    async def test_parse_query(self, parsed_queries, query_key, expected, mentions):
+        """Test parsing person / emotion / context search queries"""
+        filters = parsed_queries[query_key]
 
-        assert filters.get("emotion") in ["excited", "Excited"]
-        assert "FAISS" in str(filters.get("entity", "")) or "FAISS" in str(filters.get("text_query", ""))
-
-    @pytest.mark.asyncio
-    async def test_parse_context_query(self):
-        """Test parsing context/folder query"""
-        query = "meetings about AWS infrastructure"
-        filters = await parse_smart_query(query)
-
-        assert filters.get("context") == "meetings"
-        assert "AWS" in str(filters.get("entity", "")) or "AWS" in str(filters.get("text_query", ""))
+        for field, accepted in expected.items():
+            assert filters.get(field) in accepted, f"{field}={filters.get(field)!r}"
+        if mentions is not None:
+            assert mentions in str(filters.get("entity", "")) or mentions in str(filters.get("text_query", ""))
 
 
 class TestConsolidationFlow:
     """Test memory consolidation"""
 
-    @pytest.mark.asyncio
-    async def test_find_candidates_by_person(self):
+    async def test_find_candidates_by_person(self, setup_test_env):
         """Test finding link candidates based on shared people"""
-        # This test requires actual notes in DB - simplified version
         note = {
             "id": "test-note-1",
             "path": "/fake/path.md",
@@ -212,68 +335,112 @@ class TestConsolidationFlow:
         candidates = find_link_candidates(note, max_candidates=5, exclude_today=False)
         assert isinstance(candidates, list)
 
-    @pytest.mark.asyncio
-    async def test_suggest_links_empty_candidates(self):
-        """Test link suggestion with no candidates"""
+    async def test_suggest_links_empty_candidates(self, monkeypatch):
+        """Test link suggestion with no candidates returns [] without calling the LLM"""
         note_text = "This is a test note about nothing in particular"
         candidates = []
 
+        call_count = 0
+
+        async def fake_ainvoke(*args, **kwargs):
+            nonlocal call_count
+            call_count += 1
+            return SimpleNamespace(content="[]")
+
+        monkeypatch.setattr(consolidation, "get_llm", lambda: SimpleNamespace(ainvoke=fake_ainvoke))
+
         links = await suggest_links_batch(note_text, candidates)
         assert links == []
+        assert call_count == 0
+
+
+def _save_note(title: str, tags: list, body: str, enrichment: dict):
+    """write_markdown() plus the enrichment index, committed on one connection"""
+    con = get_db_connection()
+    try:
+        note_id, path, title = write_markdown(title, tags, body, db_connection=con)
+        index_note_with_enrichment(note_id, enrichment, db_connection=con)
+    finally:
+        con.close()
+    return note_id, path, title
+
 
+def _note_ids(results) -> set:
+    """notes_meta IDs of search results (which only carry the note path)"""
+    paths = [str(r["path"]) for r in results]
+    if not paths:
+        return set()
+    con = get_db_connection()
+    placeholders = ','.join(['?' for _ in paths])
+    rows = con.execute(f"SELECT id FROM notes_meta WHERE path IN ({placeholders})", paths).fetchall()
+    con.close()
+    return {row[0] for row in rows}
 
+
+@pytest.mark.slow
 class TestIntegration:
     """Integration tests for complete flows"""
 
-    @pytest.mark.skip(reason="Requires refactoring DB_PATH to be dynamic for test isolation. See TODO: Implement proper dependency injection for database config.")
-    @pytest.mark.asyncio
     async def test_full_capture_and_search_flow(self, setup_test_env):
-        """Test complete flow: classify -> enrich -> save -> search
-
-        NOTE: This test is currently skipped because modules import DB_PATH at module level,
-        which prevents test fixtures from overriding the database path.
+        """Test complete flow: (classify + enrich || parse search query) -> save -> search
 
-        To fix: Either implement get_db_path() pattern or create separate integration tests
-        that run against the real database.
+        Parsing the search query doesn't depend on the captured note, so it runs
+        alongside the capture call; only the indexed search has to wait for the save.
         """
-        # Step 1: Classify
+        # Steps 1-2: Classify and enrich in a single LLM call, while the
+        # search query is parsed
         text = "Fix the authentication bug in the login service"
-        classification = await classify_note_async(text)
+        query = "authentication bug"
+        async with asyncio.TaskGroup() as tg:
+            capture_task = tg.create_task(classify_and_enrich_async(text))
+            parse_task = tg.create_task(parse_smart_query(query))
+        combined = capture_task.result()
+        classification = combined["classification"]
+        enrichment = combined["enrichment"]
 
         # Classification should return basic fields
         assert "title" in classification
         assert "tags" in classification
 
-        # Step 2: Enrich
-        enrichment = await enrich_note_metadata(text, classification)
+        # Enrichment should return extracted entities
         assert "entities" in enrichment
 
-        # Step 3: Save (would write to disk in real scenario)
-        # Simplified - just verify write_markdown doesn't crash
-        try:
-            note_id, path, title = write_markdown(
-                title=classification["title"],
-                tags=classification["tags"],
-                body=text,
-                status=classification.get("status"),
-                enrichment=enrichment
-            )
-            assert note_id is not None
-            # Verify dimensions exist
-            assert enrichment.get("has_action_items") is not None
-        except Exception as e:
-            # write_markdown might fail in test env, that's ok
-            pass
-
-        # Step 4: Search would work if notes were indexed
-        # Just verify search_notes_smart doesn't crash
-        results = await search_notes_smart("authentication bug", limit=5)
-        assert isinstance(results, list)
+        # Step 3: Save; the file and index writes are blocking, so run them off the
+        # event loop (to_thread copies the context, so the test DB override holds)
+        note_id, path, title = await asyncio.to_thread(
+            _save_note, classification["title"], classification["tags"], text, enrichment
+        )
+
+        # The note lands in the session's tmp_path_factory notes dir, not the real vault
+        assert Path(path).parent == setup_test_env.notes_dir
+        assert Path(path).exists()
+
+        # The index is the session's in-memory database; nothing is written under .index/
+        assert str(get_db_path()).startswith("file:") and "mode=memory" in str(get_db_path())
+        assert not (setup_test_env.notes_dir / ".index").exists()
+
+        # Step 4: The text index has the new note next to the seeded one
+        seeded_id = setup_test_env.note_ids["Authentication bug in login service"]
+        assert {seeded_id, note_id} <= _note_ids(search_notes(query, limit=10))
+
+        # Smart search (reusing the parsed filters) finds the seeded note
+        results = await search_notes_smart(query, limit=5, filters=parse_task.result())
+        assert seeded_id in _note_ids(results)
 
 
+@pytest.mark.unit
 class TestLLMClient:
     """Test LLM client singleton"""
 
+    @pytest.fixture(autouse=True)
+    def mock_chat_ollama(self, monkeypatch):
+        """Build a spec'd mock instead of a real ChatOllama (and its HTTP client)"""
+        import api.llm.client as llm_client
+        from langchain_ollama import ChatOllama
+        monkeypatch.setattr(llm_client, "ChatOllama", create_autospec(ChatOllama))
+        monkeypatch.setattr(llm_client, "_llm_instance", None)
+        monkeypatch.setattr(llm_client, "_http_client", None)
+
     def test_llm_singleton(self):
         """Test that get_llm returns same instance"""
         llm1 = get_llm()
@@ -290,6 +457,27 @@ class TestLLMClient:
         assert hasattr(llm, "ainvoke")
 
 
+@pytest.mark.unit
+class TestLLMClientConstruction:
+    """Test building the real LLM client"""
+
+    def test_llm_never_called_during_construction(self):
+        """Test that getting/building LLM clients does no network I/O"""
+        with patch.object(httpx.Client, "send") as sync_send, \
+                patch.object(httpx.AsyncClient, "send") as async_send:
+            get_llm()
+            get_llm(temperature=0.0)
+
+        sync_send.assert_not_called()
+        async_send.assert_not_called()
+
+
 if __name__ == "__main__":
     # Run with: python tests/test_refactor_regression.py
-    pytest.main([__file__, "-v", "--tb=short"])
+    args = [__file__, "-v", "--tb=short"]
+    try:
+        import xdist  # noqa: F401
+        args += ["-n", "auto", "--dist", "loadscope"]
+    except ImportError:
+        pass
+    pytest.main(args)
@@ -5,27 +5,57 @@ Using LiteLLM with OpenAI Agents SDK
 """
 
 import asyncio
+import contextlib
 import os
 import litellm
 import agentops
 from agents import Agent, Runner, function_tool
 from dotenv import load_dotenv
+from _concurrent_output import run_tests_concurrently
+from _tool_helpers import evaluate_expression
+from _agentops_sessions import drain_session_ends, end_session_in_background
 
 # Load environment variables
 load_dotenv()
 
-# Initialize AgentOps
-agentops.init()
+# Initialize AgentOps only when there's a key to report with; sessions are
+# opened explicitly per query
+AGENTOPS_ENABLED = bool(os.getenv("AGENTOPS_API_KEY"))
+if AGENTOPS_ENABLED:
+    agentops.init(auto_start_session=False)
+
+@contextlib.contextmanager
+def traced_session(tags: dict):
+    """AgentOps session around one query (a no-op when AgentOps is disabled)"""
+    if not AGENTOPS_ENABLED:
+        yield
+        return
+
+    session = agentops.start_session(tags=tags)
+    try:
+        yield
+    except Exception as e:
+        end_session_in_background(session, error=str(e))
+        raise
+    end_session_in_background(session)
+
+async def run_traced(agent: Agent, query: str, tags: dict):
+    """Runner.run for one query inside its own AgentOps session"""
+    with traced_session(tags):
+        return await Runner.run(starting_agent=agent, input=query)
 
 # Configure LiteLLM
 os.environ['LITELLM_LOG'] = 'INFO'
 
-# Set the model globally for LiteLLM
-litellm.model = "ollama/qwen3:4b-instruct"
+MODEL_NAME = "ollama/qwen3:4b-instruct"
+
+# Set the model globally for LiteLLM (once - the concurrently run tests take
+# the model as a parameter instead of reassigning this)
+litellm.model = MODEL_NAME
 
 # Register the model with function calling support
 litellm.register_model(model_cost={
-    "ollama/qwen3:4b-instruct": {
+    MODEL_NAME: {
         "supports_function_calling": True
     },
 })
@@ -41,87 +71,71 @@ def get_time() -> str:
 def calculate(expression: str) -> str:
     """Calculate a mathematical expression."""
     try:
-        result = eval(expression, {"__builtins__": {}})
+        result = evaluate_expression(expression)
         return f"{expression} = {result}"
     except Exception as e:
         return f"Error: {e}"
 
-async def test_basic():
-    """Test basic agent with tools following architecture_example pattern"""
+# One agent shared by both tests (tool schemas are built once, not per test).
+# No model is set, like architecture_example.py - litellm.model picks it
+AGENT = Agent(
+    name="Assistant",
+    instructions="You are a helpful assistant. Use the tools to answer questions.",
+    tools=[get_time, calculate]
+)
+
+async def run_basic(model_name: str):
+    """Test basic agent with tools following architecture_example pattern
+
+    The agent itself has no model; model_name is the litellm.model default it resolves to.
+    """
     print("\n" + "="*60)
     print("Testing Basic Agent with LiteLLM")
-    print(f"Model: {litellm.model}")
+    print(f"Model: {model_name}")
     print("="*60)
 
-    # Create agent WITHOUT specifying model (like architecture_example.py)
-    agent = Agent(
-        name="Assistant",
-        instructions="You are a helpful assistant. Use the tools to answer questions.",
-        tools=[get_time, calculate]
-    )
+    agent = AGENT
 
     test_queries = [
         "What time is it?",
         "Calculate 25 + 17"
     ]
 
-    for query in test_queries:
+    # Queries are independent - overlap their LLM waits (up to OLLAMA_NUM_PARALLEL
+    # slots server-side), then report in query order
+    tags = {"model": model_name, "test": "basic"}
+    results = await asyncio.gather(
+        *(run_traced(agent, query, tags) for query in test_queries),
+        return_exceptions=True
+    )
+
+    for query, result in zip(test_queries, results):
         print(f"\nQuery: {query}")
         print("-" * 40)
 
-        # Start AgentOps session
-        session = agentops.start_session(tags={
-            "model": litellm.model,
-            "test": "basic"
-        })
-
-        try:
-            # Run the agent (same pattern as architecture_example.py)
-            result = await Runner.run(starting_agent=agent, input=query)
+        if isinstance(result, Exception):
+            print(f"Error: {result}")
+        else:
             print(f"Response: {result.final_output}")
-            agentops.end_session(session)
-        except Exception as e:
-            print(f"Error: {e}")
-            agentops.end_session(session, error=str(e))
 
-async def test_with_model_override():
+async def run_with_model_override(model_name: str):
     """Test with explicit model setting"""
     print("\n" + "="*60)
     print("Testing with Explicit Model")
     print("="*60)
 
-    # Try setting model explicitly
-    model_name = "ollama/qwen3:4b-instruct"
-
-    # Set LiteLLM model
-    litellm.model = model_name
-
-    # Create agent and set model attribute
-    agent = Agent(
-        name="Assistant",
-        instructions="You are a helpful assistant. Use the tools to answer questions.",
-        tools=[get_time, calculate]
-    )
-
-    # Try setting model on agent (might not work but worth trying)
-    agent.model = model_name
+    # Same agent with the model set explicitly (clone leaves AGENT untouched)
+    agent = AGENT.clone(model=model_name)
 
     query = "What is 100 divided by 4?"
     print(f"\nQuery: {query}")
     print("-" * 40)
 
-    session = agentops.start_session(tags={
-        "model": model_name,
-        "test": "explicit_model"
-    })
-
     try:
-        result = await Runner.run(starting_agent=agent, input=query)
+        result = await run_traced(agent, query, {"model": model_name, "test": "explicit_model"})
         print(f"Response: {result.final_output}")
-        agentops.end_session(session)
     except Exception as e:
         print(f"Error: {e}")
-        agentops.end_session(session, error=str(e))
 
 async def main():
     """Run tests"""
@@ -130,11 +144,16 @@ async def main():
     print("Following architecture_example.py pattern")
     print("="*60)
 
-    # Test basic usage
-    await test_basic()
-
-    # Test with explicit model
-    await test_with_model_override()
+    # The tests are independent and neither mutates litellm.model, so they run
+    # concurrently; each one's output (and failure, if any) is buffered and
+    # printed in the usual order
+    try:
+        await run_tests_concurrently(
+            run_basic(MODEL_NAME),
+            run_with_model_override(MODEL_NAME)
+        )
+    finally:
+        await drain_session_ends()
 
     print("\n" + "="*60)
     print("Test completed")
@@ -144,5 +163,6 @@ if __name__ == "__main__":
     try:
         asyncio.run(main())
     finally:
-        agentops.end_all_sessions()
-        print("\n✅ All sessions ended")
\ No newline at end of file
+        if AGENTOPS_ENABLED:
+            agentops.end_all_sessions()
+            print("\n✅ All sessions ended")
\ No newline at end of file